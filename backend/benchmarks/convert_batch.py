@@ -0,0 +1,76 @@
+"""Przepustowość POST /api/convert/batch/.
+
+Uruchomienie (z katalogu backend/):
+    python -m benchmarks.convert_batch --rows 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks._django import setup, test_database
+
+CODES = ["USD", "EUR", "CHF", "GBP", "JPY", "CZK", "NOK", "SEK", "HUF", "CAD"]
+
+
+def seed(days: int) -> list[date]:
+    from rates.business_days import business_days
+    from rates.models import ExchangeRate
+
+    end = date(2026, 1, 30)
+    dates = business_days(end - timedelta(days=days), end)
+    ExchangeRate.objects.bulk_create(
+        [
+            ExchangeRate(code=code, currency=code, rate=Decimal(random.randint(1000, 50000)) / 10000, effective_date=d)
+            for d in dates
+            for code in CODES
+        ],
+        batch_size=5000,
+    )
+    return dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=3 * 365, help="calendar days of seeded history")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    import json
+
+    from django.test import Client
+
+    with test_database():
+        random.seed(0)
+        dates = seed(args.days)
+        first = dates[0]
+        span = (dates[-1] - first).days + 5
+        rows = [
+            {
+                "amount": f"{random.randint(1, 10_000_000) / 100:.2f}",
+                "code": random.choice(CODES),
+                "date": (first + timedelta(days=random.randrange(span))).isoformat(),
+            }
+            for _ in range(args.rows)
+        ]
+        body = json.dumps(rows)
+        client = Client()
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            resp = client.post("/api/convert/batch/", body, content_type="application/json")
+            timings.append(time.perf_counter() - started)
+            assert resp.status_code == 200, resp.content[:200]
+
+        best = min(timings)
+        print(f"rows={args.rows} stored_dates={len(dates)} codes={len(CODES)}")
+        print(f"best={best:.3f}s median={sorted(timings)[len(timings) // 2]:.3f}s "
+              f"throughput={args.rows / best:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Syntetyczna historia tabel A NBP: losowe błądzenie kursów w dni robocze.
+
+Wynik jest deterministyczny dla danego seed, więc kolejne uruchomienia
+benchmarków pracują na identycznych danych.
+"""
+import math
+import random
+from datetime import date
+from decimal import Decimal
+
+# kod -> (nazwa, przybliżony kurs startowy w PLN)
+CURRENCIES = {
+    "THB": ("bat (Tajlandia)", 0.11), "USD": ("dolar amerykański", 3.9),
+    "AUD": ("dolar australijski", 2.6), "HKD": ("dolar Hongkongu", 0.5),
+    "CAD": ("dolar kanadyjski", 2.9), "NZD": ("dolar nowozelandzki", 2.4),
+    "SGD": ("dolar singapurski", 2.9), "EUR": ("euro", 4.3),
+    "HUF": ("forint (Węgry)", 0.011), "CHF": ("frank szwajcarski", 4.4),
+    "GBP": ("funt szterling", 5.0), "UAH": ("hrywna (Ukraina)", 0.1),
+    "JPY": ("jen (Japonia)", 0.026), "CZK": ("korona czeska", 0.17),
+    "DKK": ("korona duńska", 0.58), "ISK": ("korona islandzka", 0.028),
+    "NOK": ("korona norweska", 0.37), "SEK": ("korona szwedzka", 0.37),
+    "RON": ("lej rumuński", 0.86), "BGN": ("lew (Bułgaria)", 2.2),
+    "TRY": ("lira turecka", 0.12), "ILS": ("nowy izraelski szekel", 1.05),
+    "CLP": ("peso chilijskie", 0.0042), "PHP": ("peso filipińskie", 0.07),
+    "MXN": ("peso meksykańskie", 0.21), "ZAR": ("rand (RPA)", 0.21),
+    "BRL": ("real (Brazylia)", 0.72), "MYR": ("ringgit (Malezja)", 0.86),
+    "IDR": ("rupia indonezyjska", 0.00024), "INR": ("rupia indyjska", 0.046),
+    "KRW": ("won południowokoreański", 0.0029), "CNY": ("yuan renminbi (Chiny)", 0.54),
+    "XDR": ("SDR (MFW)", 5.2), "HRK": ("kuna (Chorwacja)", 0.57),
+    "RUB": ("rubel rosyjski", 0.05),
+}
+
+DAILY_VOLATILITY = 0.006
+
+
+def generate_tables(date_from: date, date_to: date, codes=None, seed: int = 0) -> list[dict]:
+    """Tabele w formacie odpowiedzi NBP ({"table", "no", "effectiveDate", "rates"}) dla dni roboczych."""
+    from rates.business_days import business_days
+
+    codes = list(codes or CURRENCIES)
+    rng = random.Random(seed)
+    levels = {code: CURRENCIES[code][1] for code in codes}
+    tables = []
+    for number, day in enumerate(business_days(date_from, date_to), start=1):
+        rates = []
+        for code in codes:
+            levels[code] *= math.exp(rng.gauss(0, DAILY_VOLATILITY))
+            rates.append({"currency": CURRENCIES[code][0], "code": code, "mid": float(f"{levels[code]:.4g}")})
+        tables.append({
+            "table": "A",
+            "no": f"{number:03d}/A/NBP/{day.year}",
+            "effectiveDate": day.isoformat(),
+            "rates": rates,
+        })
+    return tables
+
+
+def load(tables: list[dict], batch_size: int = 5000) -> int:
+    """Zapisuje tabele do bazy przez bulk_create (szybko, bez sygnałów) i odświeża migawkę najnowszych kursów."""
+    from rates.models import ExchangeRate
+    from rates.snapshot import refresh_latest_snapshot
+
+    objs = [
+        ExchangeRate(code=r["code"], currency=r["currency"], rate=Decimal(str(r["mid"])),
+                     effective_date=table["effectiveDate"])
+        for table in tables
+        for r in table["rates"]
+    ]
+    ExchangeRate.objects.bulk_create(objs, batch_size=batch_size)
+    refresh_latest_snapshot()
+    return len(objs)
@@ -0,0 +1,82 @@
+"""Opóźnienie p50/p99 GET /api/rates/latest/ dla różnych trybów DB_CONN_MODE.
+
+Dla każdego trybu startuje osobny serwer (jednowątkowy runserver, tak jak
+synchroniczny worker gunicorna) na skonfigurowanej bazie i wysyła do niego
+sekwencyjne żądania. Baza powinna mieć choć jedną tabelę kursów.
+Cache kursów jest wyłączony (DummyCache), bo inaczej /latest/ po pierwszym
+żądaniu nie dotyka bazy i porównanie trybów połączeń nic nie mierzy.
+
+Uruchomienie (z katalogu backend/):
+    python -m benchmarks.db_latency --modes off,persistent --requests 1000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks._django import BACKEND_DIR
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def measure(mode, port, count, warmup, path):
+    env = dict(os.environ, DB_CONN_MODE=mode, DJANGO_CACHE_BACKEND="django.core.cache.backends.dummy.DummyCache")
+    server = subprocess.Popen(
+        [sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload", "--nothreading"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(f"{base}/api/health/")
+        session = requests.Session()
+        for _ in range(warmup):
+            session.get(base + path)
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            resp = session.get(base + path)
+            timings.append(time.perf_counter() - started)
+            resp.raise_for_status()
+    finally:
+        server.terminate()
+        server.wait()
+    timings.sort()
+    return percentile(timings, 50), percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="off,persistent", help="comma-separated DB_CONN_MODE values")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/api/rates/latest/")
+    args = parser.parse_args()
+
+    for i, mode in enumerate(args.modes.split(",")):
+        p50, p99 = measure(mode, args.port + i, args.requests, args.warmup, args.path)
+        print(f"{mode:<11} p50={p50 * 1000:7.2f} ms  p99={p99 * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Lokalny stub api.nbp.pl (tabela A) dla benchmarków offline.
+
+Obsługuje /api/exchangerates/tables/A/, .../A/{data}/, .../A/{od}/{do}/ i .../A/last/{n}/,
+zwraca 404 dla dni bez tabeli (weekendy, święta) i może dokładać opóźnienie.
+
+Samodzielnie (z katalogu backend/):
+    python -m benchmarks.nbp_stub --port 8900 --years 1 --latency 0.05
+"""
+import argparse
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "/api/exchangerates/tables/A/"
+MAX_RANGE_DAYS = 93
+
+
+class NBPStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, tables, latency=0.0):
+        super().__init__(address, NBPStubHandler)
+        self.tables = {t["effectiveDate"]: t for t in tables}
+        self.dates = sorted(self.tables)
+        self.latency = latency
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+
+class NBPStubHandler(BaseHTTPRequestHandler):
+    server: NBPStubServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json; charset=utf-8"):
+        data = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self):
+        self._send(404, "404 NotFound - Not Found - Brak danych", "text/plain; charset=utf-8")
+
+    def _bad_request(self, message):
+        self._send(400, f"400 BadRequest - {message}", "text/plain; charset=utf-8")
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        path = self.path.split("?", 1)[0]
+        if not path.startswith(PREFIX):
+            return self._not_found()
+        parts = [p for p in path[len(PREFIX):].split("/") if p]
+
+        if not parts:
+            return self._tables(server.dates[-1:])
+        if parts[0] == "today":
+            return self._tables([date.today().isoformat()])
+        if parts[0] == "last" and len(parts) == 2 and parts[1].isdigit():
+            return self._tables(server.dates[-int(parts[1]):])
+
+        try:
+            days = [date.fromisoformat(p) for p in parts]
+        except ValueError:
+            return self._bad_request("Błędny zakres dat / Invalid date range")
+        if len(days) == 1:
+            return self._tables([days[0].isoformat()])
+        if len(days) == 2:
+            start, end = days
+            if end < start or (end - start) > timedelta(days=MAX_RANGE_DAYS):
+                return self._bad_request("Przekroczony limit 93 dni / Limit of 93 days has been exceeded")
+            lo = bisect_left(server.dates, start.isoformat())
+            hi = bisect_right(server.dates, end.isoformat())
+            return self._tables(server.dates[lo:hi])
+        return self._not_found()
+
+    def _tables(self, dates):
+        tables = [self.server.tables[d] for d in dates if d in self.server.tables]
+        if not tables:
+            return self._not_found()
+        self._send(200, json.dumps(tables, ensure_ascii=False))
+
+
+@contextmanager
+def stub_server(tables, latency=0.0, port=0):
+    """Uruchamia stub w wątku w tle; zwraca serwer (adres bazowy w `server.url`)."""
+    server = NBPStubServer(("127.0.0.1", port), tables, latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    from benchmarks._django import setup
+    from benchmarks.dataset import generate_tables
+
+    setup()
+    today = date.today()
+    tables = generate_tables(date(today.year - args.years + 1, 1, 1), today)
+    server = NBPStubServer(("127.0.0.1", args.port), tables, args.latency)
+    print(f"NBP stub with {len(tables)} tables at {server.url} (set NBP_API_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
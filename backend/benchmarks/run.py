@@ -0,0 +1,181 @@
+"""Zestaw benchmarków backendu na syntetycznych danych i lokalnym stubie NBP.
+
+Działa offline na tymczasowej bazie testowej. Wynik zapisuje jako JSON,
+który można porównać z wcześniej zapisanym raportem bazowym.
+
+Uruchomienie (z katalogu backend/):
+    python -m benchmarks.run --output report.json
+    python -m benchmarks.run --years 2 --baseline report.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks._django import setup, test_database
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def measure(run, repeat, before=None):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    # pierwszy przebieg rozgrzewa cache Django/połączenie i nie jest liczony
+    if before:
+        before()
+    run()
+
+    timings, queries = [], []
+    for _ in range(repeat):
+        if before:
+            before()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+    timings.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(timings[0], 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "max_ms": round(timings[-1], 3),
+        "queries": statistics.median(queries),
+    }
+
+
+def scenarios(client, last_day, repeat):
+    """Nazwa -> (funkcja jednego przebiegu, przygotowanie przed przebiegiem, liczba powtórzeń)."""
+    from django.core.cache import cache
+
+    from rates.models import ExchangeRate
+
+    year_ago = (last_day - timedelta(days=365)).isoformat()
+    month_ago = last_day - timedelta(days=30)
+
+    def get(url):
+        def run():
+            resp = client.get(url)
+            assert resp.status_code == 200, (url, resp.status_code)
+        return run
+
+    def post(url):
+        def run():
+            resp = client.post(url)
+            assert resp.status_code == 200, (url, resp.status_code, resp.content[:200])
+        return run
+
+    def drop_from(day):
+        return lambda: ExchangeRate.objects.filter(effective_date__gte=day).delete()
+
+    return {
+        "latest": (get("/api/rates/latest/"), None, repeat),
+        "range_1y": (get(f"/api/rates/range/?date_from={year_ago}&date_to={last_day.isoformat()}"), None, repeat),
+        "series_1y": (get(f"/api/rates/series/USD/?date_from={year_ago}"), None, repeat),
+        "summary_month_cold": (get("/api/rates/summary/?period=month"), cache.clear, repeat),
+        "summary_month_warm": (get("/api/rates/summary/?period=month"), None, repeat),
+        "ingestion_latest": (post("/api/currencies/fetch/"), drop_from(last_day), repeat),
+        "backfill_1m": (
+            post(f"/api/currencies/fetch-range/?date_from={month_ago.isoformat()}&date_to={last_day.isoformat()}"),
+            drop_from(month_ago),
+            max(1, repeat // 5),
+        ),
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Wypisuje porównanie p50 z raportem bazowym; zwraca listę regresji."""
+    regressions = []
+    print(f"\n{'scenario':<20} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, base in baseline["scenarios"].items():
+        current = report["scenarios"].get(name)
+        if not current:
+            continue
+        ratio = current["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<20} {base['p50_ms']:>8.2f}ms {current['p50_ms']:>8.2f}ms {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--codes", type=int, default=35, help="number of currencies (max 35)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--nbp-latency", type=float, default=0.02, help="seconds added by the NBP stub")
+    parser.add_argument("--only", type=str, help="comma-separated scenario names")
+    parser.add_argument("--output", type=str, help="write the JSON report to this file")
+    parser.add_argument("--baseline", type=str, help="compare p50 against this JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown vs baseline")
+    args = parser.parse_args()
+
+    setup()
+    import django
+    from django.db import connection
+    from django.test import Client, override_settings
+
+    from benchmarks.dataset import CURRENCIES, generate_tables, load
+    from benchmarks.nbp_stub import stub_server
+
+    last_day = date(2026, 1, 30)
+    codes = list(CURRENCIES)[: args.codes]
+    tables = generate_tables(date(last_day.year - args.years + 1, 1, 1), last_day, codes)
+
+    report = {
+        "meta": {
+            "years": args.years,
+            "codes": len(codes),
+            "tables": len(tables),
+            "nbp_latency_s": args.nbp_latency,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+    }
+
+    with test_database(), stub_server(tables, latency=args.nbp_latency) as stub, \
+            override_settings(NBP_API_URL=stub.url):
+        started = time.perf_counter()
+        report["meta"]["rows"] = load(tables)
+        report["meta"]["load_s"] = round(time.perf_counter() - started, 3)
+        report["meta"]["database"] = connection.vendor
+
+        client = Client()
+        selected = set(args.only.split(",")) if args.only else None
+        for name, (run, before, repeat) in scenarios(client, last_day, args.repeat).items():
+            if selected and name not in selected:
+                continue
+            stub.requests = 0
+            result = measure(run, repeat, before)
+            result["nbp_requests"] = stub.requests
+            report["scenarios"][name] = result
+            print(f"{name:<20} p50={result['p50_ms']:9.2f} ms  p95={result['p95_ms']:9.2f} ms  "
+                  f"queries={result['queries']}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(report, json.load(fh), args.tolerance)
+        if regressions:
+            print(f"\nRegressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
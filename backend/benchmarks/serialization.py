@@ -0,0 +1,63 @@
+"""Koszt serializacji jednego wiersza kursu: ModelSerializer DRF vs rates.fastjson.
+
+Nie potrzebuje bazy - porównuje samą drogę od wierszy do bajtów odpowiedzi.
+Uruchomienie (z katalogu backend/):
+    python -m benchmarks.serialization --rows 35000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks._django import setup
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=35_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    from django.http import JsonResponse
+
+    from rates.fastjson import FastJsonResponse, orjson, rate_rows
+    from rates.models import ExchangeRate
+    from rates.serializers import ExchangeRateSerializer
+
+    start = date(2006, 1, 2)
+    tuples = [
+        (f"C{i % 35:02d}", "waluta", Decimal(f"{3 + (i % 1000) / 1000:.6f}"), start + timedelta(days=i // 35))
+        for i in range(args.rows)
+    ]
+
+    def drf_path():
+        # tak jak wcześniej: instancje modelu z zapytania + ModelSerializer + JsonResponse
+        instances = [
+            ExchangeRate(code=code, currency=currency, rate=rate, effective_date=d)
+            for code, currency, rate, d in tuples
+        ]
+        JsonResponse({"rates": ExchangeRateSerializer(instances, many=True).data})
+
+    def fast_path():
+        FastJsonResponse({"rates": rate_rows(tuples)})
+
+    drf = best_of(drf_path, args.repeat)
+    fast = best_of(fast_path, args.repeat)
+    print(f"rows={args.rows} encoder={'orjson' if orjson else 'json'}")
+    print(f"drf   {drf * 1e6 / args.rows:8.2f} us/row  ({drf * 1000:.1f} ms)")
+    print(f"fast  {fast * 1e6 / args.rows:8.2f} us/row  ({fast * 1000:.1f} ms)")
+    print(f"speedup x{drf / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Czas startu i pamięć workera dla profili ustawień (config.settings vs config.settings_api).
+
+Każdy pomiar to świeży interpreter, który robi to samo co worker gunicorna przed
+pierwszym żądaniem: importuje config.wsgi i ładuje URLconf (a więc rates.views).
+Czas i RSS mierzy się bez -X importtime (ono samo spowalnia import), a potem
+jeden dodatkowy przebieg z -X importtime pokazuje pakiety o największym koszcie.
+Baza nie jest potrzebna. Uruchomienie (z katalogu backend/):
+    python -m benchmarks.startup --repeat 7 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks._django import BACKEND_DIR
+
+PROFILES = ("config.settings", "config.settings_api")
+
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+from config.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "heavy": sorted(m for m in ("django.contrib.admin", "rest_framework", "requests", "numpy") if m in sys.modules),
+}))
+"""
+
+
+def run_child(settings_module, importtime=False):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, PYTHONDONTWRITEBYTECODE="1")
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD]
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def _package(module):
+    parts = module.split(".")
+    return ".".join(parts[:3] if parts[0] == "django" else parts[:1])
+
+
+def slowest_imports(stderr, top):
+    """Czas własny importów (kolumna self z -X importtime) zsumowany po pakietach."""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        package = _package(name.strip())
+        totals[package] = totals.get(package, 0) + int(self_us)
+    rows = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": package, "self_ms": us / 1000} for package, us in rows]
+
+
+def measure(settings_module, repeat, top):
+    run_child(settings_module)  # rozgrzanie cache plików .pyc i systemu plików
+    samples = [run_child(settings_module)[0] for _ in range(repeat)]
+    _, stderr = run_child(settings_module, importtime=True)
+    return {
+        "settings": settings_module,
+        "startup_ms_p50": statistics.median(s["seconds"] for s in samples) * 1000,
+        "max_rss_mb_p50": statistics.median(s["max_rss_kb"] for s in samples) / 1024,
+        "modules": samples[-1]["modules"],
+        "heavy_modules_loaded": samples[-1]["heavy"],
+        "slowest_imports": slowest_imports(stderr, top),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="ile najdroższych pakietów pokazać")
+    parser.add_argument("--settings", action="append", help="profil ustawień (domyślnie oba)")
+    parser.add_argument("--output", help="zapisz raport JSON do pliku")
+    args = parser.parse_args()
+
+    report = [measure(s, args.repeat, args.top) for s in args.settings or PROFILES]
+    for r in report:
+        print(
+            f"{r['settings']:<22} start p50 {r['startup_ms_p50']:7.1f} ms   "
+            f"RSS {r['max_rss_mb_p50']:6.1f} MB   modules {r['modules']:5d}   "
+            f"heavy: {', '.join(r['heavy_modules_loaded']) or '-'}"
+        )
+        for row in r["slowest_imports"]:
+            print(f"    {row['self_ms']:8.1f} ms  {row['package']}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'rates.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -76,6 +79,59 @@ DATABASES = {
     }
 }
 
+# Cykl życia połączeń z bazą (DB_CONN_MODE):
+#   off        - nowe połączenie na każde żądanie (domyślne zachowanie Django)
+#   persistent - połączenie trzymane przez DB_CONN_MAX_AGE sekund, sprawdzane przed ponownym użyciem
+#   pool       - pula psycopg 3 (wymaga pakietu "psycopg[pool]"), osobna w każdym workerze gunicorna;
+#                max_size domyślnie = liczba wątków workera (GUNICORN_THREADS), więc łącznie
+#                baza widzi do WEB_CONCURRENCY * DB_POOL_MAX_SIZE połączeń
+# Pod ASGI tylko off albo pool: Django nie zaleca tam połączeń persistent
+# (każde żądanie async dostaje własny wątek i własne połączenie).
+DB_CONN_MODE = os.environ.get("DB_CONN_MODE", "off")
+
+if DB_CONN_MODE == "persistent":
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get("DB_CONN_MAX_AGE", "60"))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONN_MODE == "pool":
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get("DB_POOL_MIN_SIZE", "1")),
+            'max_size': int(os.environ.get("DB_POOL_MAX_SIZE", os.environ.get("GUNICORN_THREADS", "4"))),
+            'timeout': float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        },
+    }
+elif DB_CONN_MODE != "off":
+    raise ImproperlyConfigured(f"DB_CONN_MODE must be one of: off, persistent, pool (got {DB_CONN_MODE!r})")
+
+
+# Cache
+# Domyślnie pamięć procesu. Gdy run_scheduler działa w osobnym procesie, ustaw wspólny
+# backend (np. FileBasedCache na wspólnym wolumenie), żeby unieważnienie po nowej tabeli
+# dotarło do workerów API.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.environ.get("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
+# Górna granica nieaktualności wpisów cache zależnych od kursów (sekundy)
+RATES_CACHE_TIMEOUT = int(os.environ.get("RATES_CACHE_TIMEOUT", "300"))
+
+# Co ile sekund strumień SSE (/api/rates/stream/) sprawdza, czy jest nowa tabela
+RATES_STREAM_POLL_SECONDS = int(os.environ.get("RATES_STREAM_POLL_SECONDS", "5"))
+
+# Adres API NBP (benchmarki podmieniają go na lokalny stub)
+NBP_API_URL = os.environ.get("NBP_API_URL", "https://api.nbp.pl/api")
+
+# Partycjonowanie tabeli kursów po roku (tylko PostgreSQL, stosowane w migracji 0003)
+RATES_PARTITIONING = os.environ.get("RATES_PARTITIONING", "0") == "1"
+
+
+# Żądania wolniejsze niż tyle milisekund są logowane z listą zapytań SQL (0 = wyłączone)
+RATES_SLOW_REQUEST_MS = int(os.environ.get("RATES_SLOW_REQUEST_MS", "0"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
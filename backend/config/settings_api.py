@@ -0,0 +1,24 @@
+"""Profil tylko dla API (DJANGO_SETTINGS_MODULE=config.settings_api).
+
+API nie korzysta z sesji, logowania, panelu admina ani DRF, więc worker
+nie ładuje tych aplikacji i ich middleware - szybszy start i mniej pamięci.
+Migracje i panel admina uruchamia się z pełnym config.settings.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    "rates",
+    "corsheaders",
+]
+
+MIDDLEWARE = [
+    "rates.middleware.MetricsMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+]
+
+# odpowiedzi to wyłącznie JSON
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
@@ -0,0 +1,47 @@
+from bisect import bisect_right
+from datetime import date
+
+from .cache import cached
+from .models import ExchangeRate
+
+
+def stored_dates() -> list[date]:
+    """Posortowane daty tabel zapisanych w bazie (z cache, unieważniane po nowej tabeli)."""
+    return cached(
+        ("stored_dates",),
+        lambda: list(
+            ExchangeRate.objects.order_by("effective_date")
+            .values_list("effective_date", flat=True)
+            .distinct()
+        ),
+    )
+
+
+def resolve_asof(dates) -> dict[date, date | None]:
+    """Dla każdej daty: data ostatniej tabeli w dniu lub przed tym dniem (None, gdy brak)."""
+    index = stored_dates()
+    resolved = {}
+    for d in dates:
+        pos = bisect_right(index, d)
+        resolved[d] = index[pos - 1] if pos else None
+    return resolved
+
+
+def lookup_asof(dates, codes=None) -> tuple[dict[date, date | None], dict[date, list[tuple]]]:
+    """Kursy obowiązujące na podane daty, pobrane jednym zapytaniem.
+
+    Zwraca (requested -> effective_date, effective_date -> [(code, currency, rate), ...]).
+    """
+    resolved = resolve_asof(dates)
+    effective = {d for d in resolved.values() if d is not None}
+
+    tables = {}
+    if effective:
+        qs = ExchangeRate.objects.filter(effective_date__in=effective)
+        if codes:
+            qs = qs.filter(code__in=codes)
+        for effective_date, code, currency, rate in (
+            qs.order_by("effective_date", "code").values_list("effective_date", "code", "currency", "rate")
+        ):
+            tables.setdefault(effective_date, []).append((code, currency, rate))
+    return resolved, tables
@@ -0,0 +1,79 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+def easter_sunday(year: int) -> date:
+    """Wielkanoc w kalendarzu gregoriańskim (algorytm Meeusa/Jonesa/Butchera)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=None)
+def polish_holidays(year: int) -> frozenset[date]:
+    """Ustawowe dni wolne od pracy w Polsce (dni, w które NBP nie publikuje tabeli A)."""
+    easter = easter_sunday(year)
+    days = {
+        date(year, 1, 1),                 # Nowy Rok
+        date(year, 5, 1),                 # Święto Pracy
+        date(year, 5, 3),                 # Święto Konstytucji 3 Maja
+        date(year, 8, 15),                # Wniebowzięcie NMP
+        date(year, 11, 1),                # Wszystkich Świętych
+        date(year, 11, 11),               # Święto Niepodległości
+        date(year, 12, 25),               # Boże Narodzenie
+        date(year, 12, 26),               # drugi dzień Bożego Narodzenia
+        easter,                           # Wielkanoc
+        easter + timedelta(days=1),       # Poniedziałek Wielkanocny
+        easter + timedelta(days=49),      # Zielone Świątki
+        easter + timedelta(days=60),      # Boże Ciało
+    }
+    if year >= 2011:
+        days.add(date(year, 1, 6))        # Trzech Króli
+    if year >= 2025:
+        days.add(date(year, 12, 24))      # Wigilia
+    return frozenset(days)
+
+
+def is_business_day(day: date) -> bool:
+    return day.weekday() < 5 and day not in polish_holidays(day.year)
+
+
+def next_business_day(day: date) -> date:
+    """Najbliższy dzień roboczy ściśle po `day`."""
+    day += timedelta(days=1)
+    while not is_business_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def _year_business_days(year: int) -> tuple[date, ...]:
+    holidays = polish_holidays(year)
+    # po numerach dni, żeby dla roku 9999 nie wychodzić poza date.max
+    first, last = date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+    days = (date.fromordinal(n) for n in range(first, last + 1))
+    return tuple(day for day in days if day.weekday() < 5 and day not in holidays)
+
+
+def business_days(date_from: date, date_to: date) -> list[date]:
+    """Dni robocze (dni publikacji tabeli A) w zakresie [date_from, date_to].
+
+    Korzysta z posortowanych list dni roboczych liczonych raz na rok,
+    więc zakres wycina się wyszukiwaniem binarnym zamiast iterować po kalendarzu.
+    """
+    result = []
+    for year in range(date_from.year, date_to.year + 1):
+        days = _year_business_days(year)
+        lo = bisect_left(days, date_from) if year == date_from.year else 0
+        hi = bisect_right(days, date_to) if year == date_to.year else len(days)
+        result.extend(days[lo:hi])
+    return result
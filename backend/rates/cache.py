@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Wszystkie klucze zależne od danych kursowych mają w sobie "generację".
+# Po zapisaniu nowej tabeli generacja się zmienia, więc stare wpisy przestają
+# być czytane i same wygasają (nie trzeba ich szukać i kasować po kolei).
+GENERATION_KEY = "rates:generation"
+
+
+def generation() -> int:
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def cache_key(*parts) -> str:
+    return ":".join(["rates", str(generation()), *(str(p) for p in parts)])
+
+
+def invalidate() -> None:
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def cached(key_parts, compute, timeout=None):
+    """Zwraca wartość z cache albo liczy ją przez `compute()` i zapisuje."""
+    key = cache_key(*key_parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, settings.RATES_CACHE_TIMEOUT if timeout is None else timeout)
+    return value
@@ -0,0 +1,109 @@
+import codecs
+import csv
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from .asof import lookup_asof
+from .fastjson import rate_str
+
+GROSZ = Decimal("0.01")
+MAX_BATCH_ROWS = 200_000
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+MODES = ("asof", "previous")
+
+
+class BatchError(ValueError):
+    pass
+
+
+def parse_rows(stream, content_type: str) -> list[dict]:
+    """Wiersze {amount, code, date} z JSON (lista lub {"items": [...]}), NDJSON albo CSV.
+
+    NDJSON i CSV czytane są ze strumienia linia po linii.
+    """
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        try:
+            return [json.loads(line, parse_float=Decimal) for line in stream if line.strip()]
+        except ValueError as exc:
+            raise BatchError(f"invalid NDJSON: {exc}")
+    if content_type == "text/csv":
+        return list(csv.DictReader(codecs.iterdecode(stream, "utf-8")))
+
+    try:
+        data = json.loads(stream.read(), parse_float=Decimal)
+    except ValueError as exc:
+        raise BatchError(f"invalid JSON: {exc}")
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise BatchError("expected a list of {amount, code, date} objects")
+    return data
+
+
+def convert_rows(rows: list[dict], mode: str = "asof") -> list[dict]:
+    """Przelicza kwoty na PLN po kursie NBP.
+
+    mode="asof": ostatnia tabela w dniu `date` lub wcześniej,
+    mode="previous": ostatnia tabela sprzed dnia `date` (reguła dla faktur).
+    Wszystkie potrzebne kursy pobierane są jednym zapytaniem.
+    """
+    parsed, results = [], []
+    for row in rows:
+        try:
+            amount = Decimal(str(row["amount"]))
+            code = str(row["code"]).upper()
+            day = datetime.strptime(str(row["date"]), "%Y-%m-%d").date()
+        except (KeyError, TypeError, InvalidOperation, ValueError):
+            parsed.append(None)
+            continue
+        if not amount.is_finite():
+            parsed.append(None)
+            continue
+        lookup_date = day
+        if mode == "previous":
+            # przed 0001-01-01 nie ma dnia (OverflowError), a więc i tabeli
+            lookup_date = day - timedelta(days=1) if day > date.min else None
+        parsed.append((amount, code, day, lookup_date))
+
+    lookup_dates = {p[3] for p in parsed if p and p[3]}
+    codes = {p[1] for p in parsed if p}
+    resolved, tables = lookup_asof(lookup_dates, codes)
+    rates = {
+        (effective_date, code): rate
+        for effective_date, table in tables.items()
+        for code, _, rate in table
+    }
+
+    for i, p in enumerate(parsed):
+        if p is None:
+            results.append({"index": i, "error": "expected amount (number), code and date (YYYY-MM-DD)"})
+            continue
+        amount, code, day, lookup_date = p
+        if code == "PLN":
+            rate, rate_date = Decimal(1), day
+        elif lookup_date is None:
+            results.append({"index": i, "error": f"no {code} rate before {day.isoformat()}"})
+            continue
+        else:
+            rate_date = resolved[lookup_date]
+            rate = rates.get((rate_date, code))
+            if rate is None:
+                results.append({"index": i, "error": f"no {code} rate on or before {lookup_date.isoformat()}"})
+                continue
+        try:
+            amount_pln = (amount * rate).quantize(GROSZ, rounding=ROUND_HALF_UP)
+        except InvalidOperation:
+            # wynik nie mieści się w precyzji Decimal (np. amount=1e30) - błąd tylko tego wiersza
+            results.append({"index": i, "error": "amount is too large"})
+            continue
+        results.append({
+            "index": i,
+            "amount": str(amount),
+            "code": code,
+            "date": day.isoformat(),
+            "rate": rate_str(rate),
+            "rate_date": rate_date.isoformat(),
+            "amount_pln": str(amount_pln),
+        })
+    return results
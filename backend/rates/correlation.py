@@ -0,0 +1,86 @@
+"""Macierz korelacji i kowariancji dziennych log-stóp zwrotu kursów.
+
+Szeregi wyrównujemy do wspólnych dni (data musi mieć kursy wszystkich walut),
+resztę liczy jedna wektorowa operacja NumPy na macierzy dni x waluty.
+"""
+from .cache import cached
+from .models import ExchangeRate
+
+METHODS = ("pearson", "spearman")
+MIN_OBSERVATIONS = 2
+
+
+class CorrelationError(ValueError):
+    pass
+
+
+def _average_ranks(np, column):
+    # rangi z remisami uśrednionymi (jak w rankingu Spearmana)
+    _, inverse, counts = np.unique(column, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return ((ends - counts + 1 + ends) / 2)[inverse]
+
+
+def _to_list(np, matrix):
+    return [[None if np.isnan(v) else round(float(v), 8) for v in row] for row in matrix]
+
+
+def compute_correlation(codes, date_from, date_to, method="pearson") -> dict:
+    import numpy as np
+
+    qs = ExchangeRate.objects.all()
+    if date_from:
+        qs = qs.filter(effective_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(effective_date__lte=date_to)
+    if codes:
+        qs = qs.filter(code__in=codes)
+    rows = list(qs.order_by("effective_date").values_list("effective_date", "code", "rate"))
+
+    codes = sorted(codes or {code for _, code, _ in rows})
+    column = {code: i for i, code in enumerate(codes)}
+    dates = sorted({d for d, _, _ in rows})
+    row_of = {d: i for i, d in enumerate(dates)}
+
+    levels = np.full((len(dates), len(codes)), np.nan)
+    for d, code, rate in rows:
+        levels[row_of[d], column[code]] = float(rate)
+
+    if len(codes) < 2:
+        raise CorrelationError("at least two currencies with rates are required")
+    missing = [code for code in codes if np.isnan(levels[:, column[code]]).all()]
+    if missing:
+        raise CorrelationError(f"no rates in this date range for: {', '.join(missing)}")
+
+    common = ~np.isnan(levels).any(axis=1)
+    levels = levels[common]
+    if len(levels) < MIN_OBSERVATIONS + 1:
+        raise CorrelationError("not enough common dates to compute returns")
+
+    returns = np.diff(np.log(levels), axis=0)
+    covariance = np.cov(returns, rowvar=False).reshape(len(codes), len(codes))
+
+    ranked = returns
+    if method == "spearman":
+        ranked = np.column_stack([_average_ranks(np, returns[:, i]) for i in range(len(codes))])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.corrcoef(ranked, rowvar=False).reshape(len(codes), len(codes))
+
+    common_dates = [d for d, keep in zip(dates, common) if keep]
+    return {
+        "method": method,
+        "codes": codes,
+        "date_from": common_dates[0],
+        "date_to": common_dates[-1],
+        "observations": len(returns),
+        "correlation": _to_list(np, correlation),
+        "covariance": _to_list(np, covariance),
+    }
+
+
+def cached_correlation(codes, date_from, date_to, method="pearson") -> dict:
+    key_codes = ",".join(sorted(codes)) if codes else "*"
+    return cached(
+        ("correlation", method, date_from, date_to, key_codes),
+        lambda: compute_correlation(codes, date_from, date_to, method),
+    )
@@ -0,0 +1,50 @@
+"""Lekka serializacja odpowiedzi z kursami: krotki z values_list -> bytes.
+
+Omija ModelSerializer (instancja modelu + pola DRF na każdy wiersz).
+Kursy zamieniamy na string jawnie w `rate_str`, daty koduje orjson natywnie.
+"""
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson jest w requirements.txt
+    orjson = None
+
+# tyle miejsc po przecinku ma ExchangeRate.rate (tak samo formatuje DRF)
+RATE_FORMAT = ".6f"
+
+
+def rate_str(value: Decimal) -> str:
+    return format(value, RATE_FORMAT)
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, separators=(",", ":")).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(dumps(data), **kwargs)
+
+
+def rate_rows(rows) -> list[dict]:
+    """(code, currency, rate, effective_date) -> format ExchangeRateSerializer."""
+    return [
+        {"code": code, "currency": currency, "rate": rate_str(rate), "effective_date": effective_date}
+        for code, currency, rate, effective_date in rows
+    ]
@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rates import partitions
+
+
+class Command(BaseCommand):
+    help = "Manage yearly partitions of the ExchangeRate table (PostgreSQL only)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--convert", action="store_true",
+                            help="convert the plain table to a partitioned one first")
+        parser.add_argument("--years-ahead", type=int, default=1,
+                            help="create partitions up to this many years after the current one (default 1)")
+        parser.add_argument("--tablespace", type=str,
+                            help="move partitions older than --before to this tablespace")
+        parser.add_argument("--before", type=int,
+                            help="year used with --tablespace (default: current year - 1)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("table partitioning requires PostgreSQL")
+
+        if not partitions.is_partitioned():
+            if not options["convert"]:
+                raise CommandError("ExchangeRate table is not partitioned; run with --convert")
+            with transaction.atomic(), connection.cursor() as cursor:
+                partitions.convert_to_partitioned(cursor)
+            self.stdout.write("Converted ExchangeRate table to yearly partitions")
+
+        year = date.today().year
+        created = partitions.ensure_partitions(year, year + options["years_ahead"])
+        # lata z historii, które trafiły do DEFAULT (np. fetch-range za poprzednie lata)
+        created += partitions.split_default()
+        for name in created:
+            self.stdout.write(f"Created partition {name}")
+
+        if options["tablespace"]:
+            before = options["before"] or year - 1
+            for name in partitions.set_tablespace(before, options["tablespace"]):
+                self.stdout.write(f"Moved {name} to tablespace {options['tablespace']}")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from rates.scheduler import Scheduler, WINDOW_START, WINDOW_END
+
+
+def _parse_time(value):
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        raise CommandError(f"invalid time {value!r}, expected HH:MM")
+
+
+class Command(BaseCommand):
+    help = "Run a long-lived loop that fetches NBP table A during its publication window"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=int, default=60,
+                            help="seconds between polls at the peak of the window (default 60)")
+        parser.add_argument("--max-interval", type=int, default=900,
+                            help="upper bound for the back-off between polls (default 900)")
+        parser.add_argument("--window-start", type=str, default=WINDOW_START.strftime("%H:%M"),
+                            help="Europe/Warsaw time when polling starts (default 11:45)")
+        parser.add_argument("--window-end", type=str, default=WINDOW_END.strftime("%H:%M"),
+                            help="Europe/Warsaw time when polling stops for the day (default 16:00)")
+        parser.add_argument("--once", action="store_true",
+                            help="run a single check and exit (for cron)")
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler(
+            interval=options["interval"],
+            max_interval=options["max_interval"],
+            window_start=_parse_time(options["window_start"]),
+            window_end=_parse_time(options["window_end"]),
+            log=self.stdout.write,
+        )
+        if options["once"]:
+            wake_at = scheduler.step()
+            self.stdout.write(f"Next check at {wake_at.isoformat()}")
+            return
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            self.stdout.write("Scheduler stopped")
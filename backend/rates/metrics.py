@@ -0,0 +1,95 @@
+"""Metryki w pamięci procesu w formacie tekstowym Prometheusa.
+
+Bez zewnętrznych zależności. Każdy worker gunicorna ma własny rejestr,
+więc scrapuje się go per proces (albo uruchamia backend z jednym workerem).
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+HELP = {
+    "fx_http_request_duration_seconds": ("histogram", "Request latency per view"),
+    "fx_http_response_size_bytes": ("histogram", "Response body size per view"),
+    "fx_db_queries_per_request": ("histogram", "SQL queries issued per request"),
+    "fx_db_query_duration_seconds": ("histogram", "Total SQL time per request"),
+    "fx_nbp_request_duration_seconds": ("histogram", "Latency of calls to api.nbp.pl"),
+    "fx_nbp_failures_total": ("counter", "Failed calls to api.nbp.pl"),
+}
+
+_lock = threading.Lock()
+_histograms = {}   # (name, labels) -> [bucket counts..., +Inf count, sum]
+_counters = {}     # (name, labels) -> value
+_buckets = {}      # name -> buckets
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def observe(name: str, value: float, buckets=LATENCY_BUCKETS, **labels) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        state = _histograms.get(key)
+        if state is None:
+            _buckets[name] = buckets
+            state = _histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        state[bisect_left(buckets, value)] += 1
+        state[-1] += value
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, **extra) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+
+    lines, seen = [], set()
+
+    def header(name):
+        if name not in seen:
+            seen.add(name)
+            kind, text = HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), state in sorted(histograms.items()):
+        header(name)
+        cumulative = 0
+        for bound, count in zip(_buckets[name], state):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {cumulative}")
+        cumulative += state[-2]
+        lines.append(f"{name}_bucket{_format_labels(labels, le='+Inf')} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {state[-1]}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
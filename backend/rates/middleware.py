@@ -0,0 +1,110 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+slow_log = logging.getLogger("rates.slow")
+
+# recorder bieżącego żądania; ContextVar przechodzi też do wątku, w którym
+# pod ASGI wykonuje się synchroniczny widok (sync_to_async kopiuje kontekst)
+current_recorder = ContextVar("rates_query_recorder", default=None)
+
+
+class QueryRecorder:
+    """execute_wrapper liczący zapytania SQL i ich czas w obrębie jednego żądania."""
+
+    def __init__(self, keep_sql=False):
+        self.keep_sql = keep_sql
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.keep_sql:
+                self.queries.append((sql, elapsed))
+
+
+def record_queries(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Podpina record_queries do każdego nowego połączenia (sygnał connection_created)."""
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+class MetricsMiddleware:
+    """Zbiera czas odpowiedzi, liczbę i czas zapytań SQL oraz rozmiar odpowiedzi per widok.
+
+    Gdy ustawione jest RATES_SLOW_REQUEST_MS, wolniejsze żądania trafiają do
+    loggera "rates.slow" razem z listą zapytań. Zapytania liczy record_queries,
+    podpięty do każdego połączenia, więc działa to także pod ASGI, gdzie widok
+    i jego połączenie żyją w innym wątku niż middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = settings.RATES_SLOW_REQUEST_MS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder(keep_sql=bool(self.slow_ms))
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self._record(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(keep_sql=bool(self.slow_ms))
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self._record(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    def _record(self, request, response, elapsed, recorder):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        metrics.observe("fx_http_request_duration_seconds", elapsed,
+                        view=view, method=request.method, status=response.status_code)
+        metrics.observe("fx_db_queries_per_request", recorder.count, metrics.COUNT_BUCKETS, view=view)
+        metrics.observe("fx_db_query_duration_seconds", recorder.duration, view=view)
+        if not response.streaming:
+            metrics.observe("fx_http_response_size_bytes", len(response.content), metrics.SIZE_BUCKETS, view=view)
+
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            slow_log.warning(
+                "Slow request %s %s: %.1f ms, %d queries (%.1f ms)\n%s",
+                request.method, request.get_full_path(), elapsed * 1000,
+                recorder.count, recorder.duration * 1000,
+                "\n".join(f"  {t * 1000:8.2f} ms  {sql}" for sql, t in recorder.queries),
+            )
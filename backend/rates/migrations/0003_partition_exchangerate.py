@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import migrations
+
+from rates import partitions
+
+
+def partition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql" or not settings.RATES_PARTITIONING:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        partitions.convert_to_partitioned(cursor)
+
+
+def unpartition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql" or not partitions.is_partitioned():
+        return
+    with schema_editor.connection.cursor() as cursor:
+        partitions.convert_to_heap(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rates', '0002_alter_exchangerate_currency'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:20
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def fill_snapshot(apps, schema_editor):
+    # to samo co rates.snapshot.refresh_latest_snapshot, na modelach historycznych
+    ExchangeRate = apps.get_model('rates', 'ExchangeRate')
+    LatestRate = apps.get_model('rates', 'LatestRate')
+    dates = list(
+        ExchangeRate.objects.order_by('-effective_date')
+        .values_list('effective_date', flat=True)
+        .distinct()[:2]
+    )
+    if not dates:
+        return
+    previous = {}
+    if len(dates) > 1:
+        previous = dict(ExchangeRate.objects.filter(effective_date=dates[1]).values_list('code', 'rate'))
+    rows = []
+    for code, currency, rate in ExchangeRate.objects.filter(effective_date=dates[0]).values_list('code', 'currency', 'rate'):
+        prev = previous.get(code)
+        rows.append(LatestRate(
+            code=code,
+            currency=currency,
+            rate=rate,
+            effective_date=dates[0],
+            previous_rate=prev,
+            previous_date=dates[1] if prev is not None else None,
+            change=rate - prev if prev is not None else None,
+            change_pct=((rate - prev) / prev * 100).quantize(Decimal('0.0001')) if prev else None,
+        ))
+    LatestRate.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rates', '0003_partition_exchangerate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestRate',
+            fields=[
+                ('code', models.CharField(max_length=4, primary_key=True, serialize=False)),
+                ('currency', models.CharField(max_length=64)),
+                ('rate', models.DecimalField(decimal_places=6, max_digits=12)),
+                ('effective_date', models.DateField()),
+                ('previous_rate', models.DecimalField(decimal_places=6, max_digits=12, null=True)),
+                ('previous_date', models.DateField(null=True)),
+                ('change', models.DecimalField(decimal_places=6, max_digits=12, null=True)),
+                ('change_pct', models.DecimalField(decimal_places=4, max_digits=10, null=True)),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+        migrations.RunPython(fill_snapshot, migrations.RunPython.noop),
+    ]
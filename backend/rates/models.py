@@ -11,4 +11,26 @@ class ExchangeRate(models.Model):
         ordering = ["-effective_date", "code"]
 
     def __str__(self):
-        return f"{self.code} @ {self.effective_date}: {self.rate}"
\ No newline at end of file
+        return f"{self.code} @ {self.effective_date}: {self.rate}"
+
+
+class LatestRate(models.Model):
+    """Najnowszy kurs każdej waluty ze zmianą względem poprzedniej tabeli.
+
+    Utrzymywane przy zapisie tabeli (rates.snapshot), żeby /api/rates/latest/
+    było jednym odczytem małej tabeli zamiast agregatu po całej historii.
+    """
+    code = models.CharField(max_length=4, primary_key=True)
+    currency = models.CharField(max_length=64)
+    rate = models.DecimalField(max_digits=12, decimal_places=6)
+    effective_date = models.DateField()
+    previous_rate = models.DecimalField(max_digits=12, decimal_places=6, null=True)
+    previous_date = models.DateField(null=True)
+    change = models.DecimalField(max_digits=12, decimal_places=6, null=True)
+    change_pct = models.DecimalField(max_digits=10, decimal_places=4, null=True)
+
+    class Meta:
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.code} @ {self.effective_date}: {self.rate} ({self.change_pct}%)"
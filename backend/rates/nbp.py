@@ -0,0 +1,108 @@
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+
+from . import metrics
+from .models import ExchangeRate
+from .signals import table_stored
+
+# NBP tabela A: najnowsze -> https://api.nbp.pl/api/exchangerates/tables/A/?format=json
+# Konkretna data -> https://api.nbp.pl/api/exchangerates/tables/A/2026-01-30/?format=json
+# (bazowy adres z settings.NBP_API_URL)
+NBP_TIMEOUT = 10
+# pierwsza tabela A dostępna w API NBP
+FIRST_TABLE_DATE = date(2002, 1, 2)
+
+
+class NBPError(Exception):
+    """Błąd pobierania tabeli z NBP.
+
+    `status` to kod, który zwracamy klientowi naszego API,
+    `nbp_status` to kod odpowiedzi NBP (None przy błędzie sieci lub parsowania).
+    """
+
+    def __init__(self, message, status=502, nbp_status=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.nbp_status = nbp_status
+
+
+def table_url(date_str: str | None = None) -> str:
+    base = f"{settings.NBP_API_URL}/exchangerates/tables/A/"
+    if date_str:
+        return f"{base}{date_str}/?format=json"
+    return f"{base}?format=json"
+
+
+def fetch_table(date_str: str | None = None) -> dict:
+    """Pobiera tabelę A z NBP dla daty (lub najnowszą) i zwraca pierwszy element odpowiedzi."""
+    import requests  # leniwie: workery API, które nie pobierają z NBP, nie ładują requests/urllib3
+
+    started = time.perf_counter()
+    try:
+        resp = requests.get(table_url(date_str), timeout=NBP_TIMEOUT)
+    except requests.Timeout as exc:
+        metrics.inc("fx_nbp_failures_total", reason="timeout")
+        raise NBPError(f"NBP request timed out: {exc}")
+    except requests.RequestException as exc:
+        metrics.inc("fx_nbp_failures_total", reason="connection")
+        raise NBPError(f"NBP request failed: {exc}")
+    finally:
+        metrics.observe("fx_nbp_request_duration_seconds", time.perf_counter() - started)
+
+    if resp.status_code not in (200, 404):
+        metrics.inc("fx_nbp_failures_total", reason=f"http_{resp.status_code}")
+
+    if resp.status_code == 404:
+        raise NBPError(f"NBP returned 404 for date={date_str or 'latest'}", status=404, nbp_status=404)
+    if resp.status_code >= 500:
+        raise NBPError(f"NBP returned {resp.status_code} (server error)", nbp_status=resp.status_code)
+    if resp.status_code != 200:
+        raise NBPError(
+            f"NBP returned status {resp.status_code}: {resp.text}",
+            status=resp.status_code,
+            nbp_status=resp.status_code,
+        )
+
+    try:
+        data = resp.json()
+    except ValueError as exc:
+        raise NBPError(f"Cannot parse JSON from NBP: {exc}")
+
+    if not data or not isinstance(data, list):
+        raise NBPError("Unexpected response format from NBP", nbp_status=200)
+
+    table = data[0]
+    if not table.get("effectiveDate") or not table.get("rates"):
+        raise NBPError("No rates in NBP response", nbp_status=200)
+    return table
+
+
+def store_table(table: dict) -> tuple[str, int, int]:
+    """Zapisuje kursy z tabeli NBP do bazy. Zwraca (effective_date, created, updated)."""
+    effective_date = table["effectiveDate"]
+    created, updated = 0, 0
+    for r in table.get("rates", []):
+        code = r.get("code")
+        currency = r.get("currency")
+        mid = r.get("mid")
+        if not (code and currency and mid):
+            continue
+        _, is_created = ExchangeRate.objects.update_or_create(
+            code=code,
+            effective_date=effective_date,
+            defaults={"currency": currency, "rate": Decimal(str(mid))},
+        )
+        if is_created:
+            created += 1
+        else:
+            updated += 1
+
+    if created or updated:
+        table_stored.send(
+            sender=ExchangeRate, effective_date=effective_date, created=created, updated=updated
+        )
+    return effective_date, created, updated
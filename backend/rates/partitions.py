@@ -0,0 +1,161 @@
+"""Partycjonowanie tabeli kursów po roku (PostgreSQL, PARTITION BY RANGE (effective_date)).
+
+Tabela partycjonowana ma klucz główny (id, effective_date), bo PostgreSQL wymaga
+kolumny partycjonującej w każdym unikalnym indeksie. Django dalej czyta i pisze
+przez `id`, a filtry po effective_date (range, summary) trafiają tylko w partycje
+z pasujących lat. Wiersze spoza utworzonych lat trafiają do partycji DEFAULT.
+"""
+from datetime import date
+
+from django.db import connection, transaction
+
+TABLE = "rates_exchangerate"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def partition_name(year: int) -> str:
+    return f"{TABLE}_y{year}"
+
+
+def _relkind(cursor, name):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [name])
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def is_partitioned() -> bool:
+    with connection.cursor() as cursor:
+        return _relkind(cursor, TABLE) == "p"
+
+
+def _create_year_partition(cursor, parent, year):
+    name = partition_name(year)
+    bounds = f"FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    if _relkind(cursor, DEFAULT_PARTITION):
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            f"WHERE effective_date >= '{year}-01-01' AND effective_date < '{year + 1}-01-01')"
+        )
+        if cursor.fetchone()[0]:
+            # rok był już w DEFAULT: przenosimy wiersze do nowej tabeli i dopiero ją podpinamy
+            cursor.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE effective_date >= '{year}-01-01' AND effective_date < '{year + 1}-01-01' RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            )
+            cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES {bounds}")
+            return
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES {bounds}")
+
+
+def ensure_partitions(first_year: int, last_year: int) -> list[str]:
+    """Tworzy brakujące partycje roczne w zakresie lat. Zwraca nazwy utworzonych."""
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for year in range(first_year, last_year + 1):
+            if _relkind(cursor, partition_name(year)) is None:
+                _create_year_partition(cursor, TABLE, year)
+                created.append(partition_name(year))
+    return created
+
+
+def default_years() -> list[int]:
+    """Lata, których wiersze leżą w partycji DEFAULT (np. po pobraniu historii)."""
+    with connection.cursor() as cursor:
+        if _relkind(cursor, DEFAULT_PARTITION) is None:
+            return []
+        cursor.execute(f"SELECT DISTINCT EXTRACT(YEAR FROM effective_date)::int FROM {DEFAULT_PARTITION} ORDER BY 1")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def split_default() -> list[str]:
+    """Tworzy partycje dla lat z DEFAULT i przenosi do nich wiersze."""
+    created = []
+    for year in default_years():
+        created += ensure_partitions(year, year)
+    return created
+
+
+def set_tablespace(before_year: int, tablespace: str) -> list[str]:
+    """Przenosi partycje starszych lat (np. na tańszy dysk)."""
+    moved = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            [TABLE],
+        )
+        for (name,) in cursor.fetchall():
+            suffix = name.removeprefix(f"{TABLE}_y")
+            if suffix.isdigit() and int(suffix) < before_year:
+                cursor.execute(f"ALTER TABLE {name} SET TABLESPACE {connection.ops.quote_name(tablespace)}")
+                moved.append(name)
+    return moved
+
+
+def convert_to_partitioned(cursor) -> None:
+    """Zamienia zwykłą tabelę kursów na partycjonowaną (po jednej partycji na rok danych)."""
+    new = f"{TABLE}_new"
+    # kolumna IDENTITY na tabeli partycjonowanej wymaga PostgreSQL 17, więc id bierze się z sekwencji
+    cursor.execute(f"CREATE SEQUENCE {new}_id_seq")
+    cursor.execute(
+        f"""
+        CREATE TABLE {new} (
+            id bigint NOT NULL DEFAULT nextval('{new}_id_seq'),
+            currency varchar(64) NOT NULL,
+            code varchar(4) NOT NULL,
+            rate numeric(12, 6) NOT NULL,
+            effective_date date NOT NULL,
+            PRIMARY KEY (id, effective_date),
+            UNIQUE (code, effective_date)
+        ) PARTITION BY RANGE (effective_date)
+        """
+    )
+    cursor.execute(f"SELECT EXTRACT(YEAR FROM MIN(effective_date)), EXTRACT(YEAR FROM MAX(effective_date)) FROM {TABLE}")
+    first, last = cursor.fetchone()
+    # zawsze co najmniej bieżący rok, także przy pustej tabeli (świeże migrate)
+    year = date.today().year
+    first = min(int(first), year) if first is not None else year
+    last = max(int(last), year) if last is not None else year
+    for year in range(first, last + 1):
+        _create_year_partition(cursor, new, year)
+    cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {new} DEFAULT")
+    cursor.execute(
+        f"INSERT INTO {new} (id, currency, code, rate, effective_date) "
+        f"SELECT id, currency, code, rate, effective_date FROM {TABLE}"
+    )
+    cursor.execute(f"ALTER SEQUENCE {new}_id_seq OWNED BY {new}.id")
+    cursor.execute(f"DROP TABLE {TABLE}")
+    cursor.execute(f"ALTER TABLE {new} RENAME TO {TABLE}")
+    cursor.execute(f"ALTER SEQUENCE {new}_id_seq RENAME TO {TABLE}_id_seq")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}"
+    )
+
+
+def convert_to_heap(cursor) -> None:
+    """Odwrotność convert_to_partitioned: jedna zwykła tabela jak w 0001_initial."""
+    old = f"{TABLE}_old"
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old}")
+    cursor.execute(f"ALTER SEQUENCE {TABLE}_id_seq RENAME TO {old}_id_seq")
+    cursor.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            currency varchar(64) NOT NULL,
+            code varchar(4) NOT NULL,
+            rate numeric(12, 6) NOT NULL,
+            effective_date date NOT NULL,
+            UNIQUE (code, effective_date)
+        )
+        """
+    )
+    cursor.execute(
+        f"INSERT INTO {TABLE} (id, currency, code, rate, effective_date) "
+        f"SELECT id, currency, code, rate, effective_date FROM {old}"
+    )
+    cursor.execute(f"DROP TABLE {old} CASCADE")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}"
+    )
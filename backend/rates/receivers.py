@@ -0,0 +1,30 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import cache
+from .middleware import install_query_recorder
+from .signals import table_stored
+from .snapshot import refresh_latest_snapshot, snapshot_previous_date
+from .stream import watcher
+
+
+@receiver(table_stored)
+def refresh_snapshot(sender, effective_date, **kwargs):
+    # migawka zależy od dwóch ostatnich tabel: backfill starszych dat jej nie zmienia,
+    # ale tabela nowsza niż "poprzednia" w migawce (także backfill dnia przed najnowszym) już tak
+    previous = snapshot_previous_date()
+    if previous is None or str(effective_date) > previous.isoformat():
+        refresh_latest_snapshot()
+
+
+@receiver(table_stored)
+def invalidate_rates_cache(sender, **kwargs):
+    cache.invalidate()
+
+
+@receiver(table_stored)
+def wake_stream_watcher(sender, **kwargs):
+    watcher.wake()
+
+
+connection_created.connect(install_query_recorder)
@@ -0,0 +1,114 @@
+import time as time_module
+import traceback
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.db import connection
+
+from .business_days import is_business_day, next_business_day
+from .models import ExchangeRate
+from .nbp import NBPError, fetch_table, store_table
+from .summary import warm_summaries
+
+WARSAW = ZoneInfo("Europe/Warsaw")
+
+# NBP publikuje tabelę A w dni robocze zwykle między 11:45 a 12:15.
+WINDOW_START = time(11, 45)
+WINDOW_END = time(16, 0)
+PEAK_MINUTES = 30
+
+
+class Scheduler:
+    """Pętla pobierająca tabelę A w oknie publikacji NBP.
+
+    W szczycie okna odpytuje NBP co `interval` sekund, potem coraz rzadziej
+    (podwajając odstęp aż do `max_interval`). Po udanym pobraniu albo w dni
+    wolne śpi do początku okna w następnym dniu roboczym.
+    """
+
+    def __init__(
+        self,
+        interval=60,
+        max_interval=900,
+        window_start=WINDOW_START,
+        window_end=WINDOW_END,
+        clock=None,
+        sleep=time_module.sleep,
+        log=print,
+    ):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.window_start = window_start
+        self.window_end = window_end
+        self.clock = clock or (lambda: datetime.now(WARSAW))
+        self.sleep = sleep
+        self.log = log
+        self.misses = 0
+        self.backoff = 0
+
+    def _at(self, day, t):
+        return datetime.combine(day, t, tzinfo=WARSAW)
+
+    def has_table(self, day) -> bool:
+        return ExchangeRate.objects.filter(effective_date=day).exists()
+
+    def poll(self, day) -> bool:
+        """Jedna próba pobrania tabeli na `day`. Zwraca True, jeśli tabela jest w bazie."""
+        try:
+            table = fetch_table(day.isoformat())
+        except NBPError as exc:
+            if exc.nbp_status != 404:
+                self.log(f"NBP poll failed: {exc.message}")
+            return False
+
+        effective_date, created, updated = store_table(table)
+        self.log(f"Stored table {effective_date}: created {created}, updated {updated}")
+        warm_summaries()
+        return True
+
+    def step(self) -> datetime:
+        """Wykonuje to, co należy zrobić teraz, i zwraca czas następnego wybudzenia."""
+        now = self.clock()
+        today = now.date()
+        start = self._at(today, self.window_start)
+        end = self._at(today, self.window_end)
+
+        if not is_business_day(today) or now >= end or self.has_table(today):
+            if is_business_day(today) and now >= end and self.misses:
+                self.log(f"No table published for {today}, giving up until next business day")
+            self.misses = self.backoff = 0
+            return self._at(next_business_day(today), self.window_start)
+
+        if now < start:
+            return start
+
+        if self.poll(today):
+            self.misses = self.backoff = 0
+            return self._at(next_business_day(today), self.window_start)
+
+        self.misses += 1
+        if now < start + timedelta(minutes=PEAK_MINUTES):
+            delay = self.interval
+        else:
+            self.backoff += 1
+            delay = min(self.interval * 2 ** self.backoff, self.max_interval)
+        return min(now + timedelta(seconds=delay), end)
+
+    def seconds_until(self, wake_at) -> float:
+        # przez timestamp (UTC): odejmowanie dat z tym samym tzinfo ignoruje zmianę czasu
+        return max(0.0, wake_at.timestamp() - self.clock().timestamp())
+
+    def run(self):
+        while True:
+            try:
+                wake_at = self.step()
+            except Exception:
+                # np. chwilowy brak bazy - demon nie może przez to kończyć pracy
+                self.log(f"Scheduler step failed, retrying in {self.interval}s:\n{traceback.format_exc()}")
+                connection.close()
+                self.sleep(self.interval)
+                continue
+            self.log(f"Next check at {wake_at.isoformat()}")
+            # nie trzymamy połączenia z bazą przez wiele godzin snu
+            connection.close()
+            self.sleep(self.seconds_until(wake_at))
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Wysyłany po zapisaniu tabeli NBP do bazy.
+# Argumenty: effective_date (str YYYY-MM-DD), created (int), updated (int).
+table_stored = Signal()
@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+
+from .cache import cached
+from .fastjson import rate_str
+from .models import ExchangeRate, LatestRate
+
+PCT = Decimal("0.0001")
+
+
+def refresh_latest_snapshot() -> int:
+    """Przelicza LatestRate z dwóch ostatnich tabel. Zwraca liczbę walut."""
+    dates = list(
+        ExchangeRate.objects.order_by("-effective_date")
+        .values_list("effective_date", flat=True)
+        .distinct()[:2]
+    )
+    rows = []
+    if dates:
+        previous = {}
+        if len(dates) > 1:
+            previous = dict(ExchangeRate.objects.filter(effective_date=dates[1]).values_list("code", "rate"))
+        for code, currency, rate in ExchangeRate.objects.filter(effective_date=dates[0]).values_list("code", "currency", "rate"):
+            prev = previous.get(code)
+            rows.append(LatestRate(
+                code=code,
+                currency=currency,
+                rate=rate,
+                effective_date=dates[0],
+                previous_rate=prev,
+                previous_date=dates[1] if prev is not None else None,
+                change=rate - prev if prev is not None else None,
+                change_pct=((rate - prev) / prev * 100).quantize(PCT) if prev else None,
+            ))
+
+    with transaction.atomic():
+        LatestRate.objects.all().delete()
+        LatestRate.objects.bulk_create(rows)
+    return len(rows)
+
+
+def snapshot_previous_date():
+    """Data poprzedniej tabeli w migawce (None, gdy migawka pusta albo bez zmian d/d)."""
+    return LatestRate.objects.aggregate(Max("previous_date"))["previous_date__max"]
+
+
+def _decimal_str(value):
+    return None if value is None else format(value, "f")
+
+
+def _latest_payload():
+    rows = list(LatestRate.objects.values_list(
+        "code", "currency", "rate", "effective_date", "previous_rate", "previous_date", "change", "change_pct",
+    ))
+    if not rows:
+        return None
+    # waluta, której nie było w ostatniej tabeli, nie należy do "najnowszych kursów"
+    latest = max(r[3] for r in rows)
+    return {
+        "date": latest,
+        "rates": [
+            {
+                "code": code,
+                "currency": currency,
+                "rate": rate_str(rate),
+                "effective_date": effective_date,
+                "previous_rate": None if previous_rate is None else rate_str(previous_rate),
+                "previous_date": previous_date,
+                "change": None if change is None else rate_str(change),
+                "change_pct": _decimal_str(change_pct),
+            }
+            for code, currency, rate, effective_date, previous_rate, previous_date, change, change_pct in rows
+            if effective_date == latest
+        ],
+    }
+
+
+def latest_payload():
+    """{"date", "rates"} z migawki (z cache procesu do następnej tabeli) albo None, gdy migawka pusta."""
+    return cached(("latest",), lambda: _latest_payload() or {}) or None
@@ -0,0 +1,121 @@
+"""Server-Sent Events z nowymi tabelami kursów.
+
+Każde połączenie to asynchroniczny generator, ale bazę sprawdza jeden wspólny
+`LatestTableWatcher` - najwyżej jedno zapytanie na RATES_STREAM_POLL_SECONDS
+na proces, niezależnie od liczby podłączonych dashboardów. Zapis tabeli w tym
+samym procesie (sygnał table_stored) wymusza sprawdzenie przy najbliższym cyklu.
+Pod WSGI używana jest synchroniczna wersja strumienia (event_stream_sync).
+"""
+import asyncio
+import threading
+import time
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+
+from .fastjson import dumps, rate_str
+from .models import ExchangeRate
+
+HEARTBEAT_SECONDS = 15
+# jak długo strumień pod WSGI trzyma wątek, zanim przeglądarka połączy się ponownie
+WSGI_STREAM_SECONDS = 300
+
+
+class LatestTableWatcher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._latest = None
+
+    def latest(self) -> date | None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= settings.RATES_STREAM_POLL_SECONDS:
+                self._latest = ExchangeRate.objects.aggregate(Max("effective_date"))["effective_date__max"]
+                self._checked_at = now
+            return self._latest
+
+    def wake(self) -> None:
+        with self._lock:
+            self._checked_at = 0.0
+
+
+watcher = LatestTableWatcher()
+
+
+def table_delta(effective_date: date) -> bytes:
+    """Zwięzła zawartość zdarzenia: {"date": ..., "rates": [[code, rate], ...]}."""
+    rows = (
+        ExchangeRate.objects.filter(effective_date=effective_date)
+        .order_by("code")
+        .values_list("code", "rate")
+    )
+    return dumps({"date": effective_date, "rates": [[code, rate_str(rate)] for code, rate in rows]})
+
+
+def format_event(effective_date: date, data: bytes) -> bytes:
+    return b"id: " + effective_date.isoformat().encode() + b"\nevent: rates\ndata: " + data + b"\n\n"
+
+
+def _poll(last_seen: date | None) -> tuple[bytes | None, date | None]:
+    """Jeden cykl strumienia: zdarzenie z tabelą nowszą niż `last_seen` (albo None).
+
+    Strumień trwa godzinami, a połączenie wątku żądania zamknęłoby się dopiero
+    przy request_finished, więc zamykamy je po każdym cyklu - N otwartych
+    dashboardów nie trzyma N bezczynnych połączeń z PostgreSQL.
+    """
+    try:
+        latest = watcher.latest()
+        if latest and (last_seen is None or latest > last_seen):
+            return format_event(latest, table_delta(latest)), latest
+        return None, last_seen
+    finally:
+        # w transakcji (np. w testach) połączenia nie wolno zamknąć
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def _retry() -> bytes:
+    return f"retry: {settings.RATES_STREAM_POLL_SECONDS * 1000}\n\n".encode()
+
+
+async def event_stream(last_seen: date | None):
+    """Wysyła zdarzenie `rates`, gdy w bazie pojawi się tabela nowsza niż `last_seen`."""
+    yield _retry()
+    idle = 0.0
+    while True:
+        event, last_seen = await sync_to_async(_poll)(last_seen)
+        if event:
+            yield event
+            idle = 0.0
+        elif idle >= HEARTBEAT_SECONDS:
+            # komentarz SSE utrzymuje połączenie przez proxy
+            yield b": ping\n\n"
+            idle = 0.0
+        await asyncio.sleep(settings.RATES_STREAM_POLL_SECONDS)
+        idle += settings.RATES_STREAM_POLL_SECONDS
+
+
+def event_stream_sync(last_seen: date | None, max_seconds: float = WSGI_STREAM_SECONDS):
+    """Wersja dla serwera WSGI (runserver, gunicorn sync).
+
+    Django pod WSGI czytałby asynchroniczny generator do końca przed wysłaniem
+    czegokolwiek, więc tu pętla jest zwykła. Połączenie zajmuje wątek workera,
+    dlatego kończymy je po `max_seconds` - EventSource wznawia je z Last-Event-ID.
+    """
+    yield _retry()
+    idle = elapsed = 0.0
+    while elapsed < max_seconds:
+        event, last_seen = _poll(last_seen)
+        if event:
+            yield event
+            idle = 0.0
+        elif idle >= HEARTBEAT_SECONDS:
+            yield b": ping\n\n"
+            idle = 0.0
+        time.sleep(settings.RATES_STREAM_POLL_SECONDS)
+        idle += settings.RATES_STREAM_POLL_SECONDS
+        elapsed += settings.RATES_STREAM_POLL_SECONDS
@@ -0,0 +1,54 @@
+from django.db.models import Max
+from django.db.models.functions import TruncYear, TruncQuarter, TruncMonth, TruncDay
+
+from .cache import cached
+from .fastjson import rate_str
+from .models import ExchangeRate
+
+PERIODS = ("year", "quarter", "month", "day")
+
+
+def build_summary(period: str, date_from=None, date_to=None) -> dict:
+    """Kursy pogrupowane po okresie: {"YYYY-MM-DD": [{code, currency, rate}, ...]}."""
+    trunc_map = {
+        "year": TruncYear("effective_date"),
+        "quarter": TruncQuarter("effective_date"),
+        "month": TruncMonth("effective_date"),
+        "day": TruncDay("effective_date"),
+    }
+    trunc_expr = trunc_map[period]
+
+    qs = ExchangeRate.objects.all()
+    if date_from:
+        qs = qs.filter(effective_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(effective_date__lte=date_to)
+
+    agg = (
+        qs
+        .annotate(period=trunc_expr)
+        .values("period", "code", "currency")
+        .order_by("period", "code")
+        .annotate(avg_rate=Max("rate"))
+    )
+
+    result = {}
+    for row in agg:
+        key = row["period"].isoformat()
+        result.setdefault(key, []).append(
+            {"code": row["code"], "currency": row["currency"], "rate": rate_str(row["avg_rate"])}
+        )
+    return result
+
+
+def cached_summary(period: str, date_from=None, date_to=None) -> dict:
+    return cached(
+        ("summary", period, date_from, date_to),
+        lambda: build_summary(period, date_from, date_to),
+    )
+
+
+def warm_summaries() -> None:
+    """Przelicza podsumowania bez filtra dat (to, co dashboard ładuje na starcie)."""
+    for period in PERIODS:
+        cached_summary(period)
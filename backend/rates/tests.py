@@ -1,8 +1,16 @@
-from datetime import date
+import json
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 import pytest
 from rest_framework.test import APIClient
 from rates.models import ExchangeRate
+from rates.business_days import business_days, easter_sunday, is_business_day, polish_holidays
+from rates.nbp import NBPError
+from rates.scheduler import Scheduler, WARSAW
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.urls import reverse
 
 
@@ -28,6 +36,11 @@ def client(db):
     return APIClient()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 def test_list_rates_latest(client, db):
     ExchangeRate.objects.create(
         code=CODE_USD,
@@ -227,4 +240,582 @@ def test_rates_range_single_day(client, db):
     body = resp.json()
     assert len(body["dates"]) == 1
     assert DATE_LATEST.isoformat() in body["dates"]
-    assert body["dates"][DATE_LATEST.isoformat()][0]["code"] == CODE_USD
\ No newline at end of file
+    assert body["dates"][DATE_LATEST.isoformat()][0]["code"] == CODE_USD
+
+
+def test_polish_holidays_movable():
+    """Test: święta ruchome liczone od Wielkanocy."""
+    assert easter_sunday(2026) == date(2026, 4, 5)
+    holidays = polish_holidays(2026)
+    assert date(2026, 4, 6) in holidays        # Poniedziałek Wielkanocny
+    assert date(2026, 6, 4) in holidays        # Boże Ciało
+    assert date(2026, 12, 24) in holidays      # Wigilia od 2025
+    assert date(2024, 12, 24) not in polish_holidays(2024)
+    assert not is_business_day(date(2026, 1, 31))  # sobota
+    assert is_business_day(DATE_LATEST)
+
+
+def _scheduler(now, **kwargs):
+    return Scheduler(clock=lambda: now, sleep=lambda s: None, log=lambda msg: None, **kwargs)
+
+
+def _nbp_table(effective_date):
+    return {
+        "effectiveDate": effective_date,
+        "rates": [{"code": CODE_USD, "currency": "dolar amerykański", "mid": 3.54}],
+    }
+
+
+@pytest.mark.django_db
+def test_scheduler_sleeps_over_weekend():
+    """Test: w sobotę harmonogram czeka do okna w poniedziałek."""
+    now = datetime(2026, 1, 31, 12, 0, tzinfo=WARSAW)
+    wake_at = _scheduler(now).step()
+    assert wake_at == datetime(2026, 2, 2, 11, 45, tzinfo=WARSAW)
+
+
+@pytest.mark.django_db
+def test_scheduler_waits_for_window():
+    """Test: przed 11:45 nie odpytujemy NBP."""
+    now = datetime(2026, 1, 30, 8, 0, tzinfo=WARSAW)
+    wake_at = _scheduler(now).step()
+    assert wake_at == datetime(2026, 1, 30, 11, 45, tzinfo=WARSAW)
+
+
+@pytest.mark.django_db
+def test_scheduler_stores_table_and_backs_off(monkeypatch):
+    """Test: po pobraniu tabeli harmonogram śpi do następnego dnia roboczego."""
+    monkeypatch.setattr("rates.scheduler.fetch_table", lambda d: _nbp_table(d))
+    now = datetime(2026, 1, 30, 11, 50, tzinfo=WARSAW)
+    wake_at = _scheduler(now).step()
+    assert ExchangeRate.objects.filter(code=CODE_USD, effective_date=DATE_LATEST).exists()
+    assert wake_at == datetime(2026, 2, 2, 11, 45, tzinfo=WARSAW)
+
+
+@pytest.mark.django_db
+def test_scheduler_polls_less_often_after_peak(monkeypatch):
+    """Test: gdy tabeli wciąż nie ma, odstęp rośnie po szczycie okna."""
+    def not_published(d):
+        raise NBPError("not yet", status=404, nbp_status=404)
+
+    monkeypatch.setattr("rates.scheduler.fetch_table", not_published)
+    now = datetime(2026, 1, 30, 11, 50, tzinfo=WARSAW)
+    assert _scheduler(now, interval=60).step() == now + timedelta(seconds=60)
+
+    late = datetime(2026, 1, 30, 13, 0, tzinfo=WARSAW)
+    scheduler = _scheduler(late, interval=60, max_interval=200)
+    assert scheduler.step() == late + timedelta(seconds=120)
+    assert scheduler.step() == late + timedelta(seconds=200)
+
+
+@pytest.mark.django_db
+def test_scheduler_sleep_across_dst_change():
+    """Test: sen z piątku na poniedziałek po zmianie czasu (29.03.2026) jest o godzinę krótszy."""
+    now = datetime(2026, 3, 27, 12, 30, tzinfo=WARSAW)
+    scheduler = _scheduler(now, interval=60)
+    scheduler.has_table = lambda day: True
+    wake_at = scheduler.step()
+    assert wake_at == datetime(2026, 3, 30, 11, 45, tzinfo=WARSAW)
+    assert scheduler.seconds_until(wake_at) == timedelta(hours=70, minutes=15).total_seconds()
+
+
+def test_scheduler_run_survives_step_errors(monkeypatch):
+    """Test: błąd bazy w kroku harmonogramu jest logowany, a pętla próbuje ponownie po `interval`."""
+    from django.db import DatabaseError
+
+    class Stop(Exception):
+        pass
+
+    sleeps, logs = [], []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise Stop
+
+    def has_table(day):
+        raise DatabaseError("connection refused")
+
+    now = datetime(2026, 1, 30, 11, 50, tzinfo=WARSAW)
+    scheduler = Scheduler(clock=lambda: now, sleep=sleep, log=logs.append, interval=30)
+    monkeypatch.setattr(scheduler, "has_table", has_table)
+    with pytest.raises(Stop):
+        scheduler.run()
+    assert sleeps == [30, 30]
+    assert "connection refused" in logs[0]
+
+
+@pytest.mark.django_db
+def test_summary_cache_invalidated_after_fetch(client, monkeypatch):
+    """Test: zapis nowej tabeli unieważnia zapamiętane podsumowanie."""
+    monkeypatch.setattr("rates.views.fetch_table", lambda d: _nbp_table(DATE_LATEST.isoformat()))
+    resp = client.get("/api/rates/summary/?period=day")
+    assert resp.json()["data"] == {}
+
+    resp = client.post("/api/currencies/fetch/")
+    assert resp.status_code == 200
+    assert resp.json()["created"] == 1
+
+    resp = client.get("/api/rates/summary/?period=day")
+    assert DATE_LATEST.isoformat() in resp.json()["data"]
+
+
+def test_business_days_range():
+    """Test: zakres dni roboczych pomija weekendy i święta, także na przełomie lat."""
+    days = business_days(date(2025, 12, 23), date(2026, 1, 7))
+    assert days == [
+        date(2025, 12, 23), date(2025, 12, 29), date(2025, 12, 30), date(2025, 12, 31),
+        date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 7),
+    ]
+
+
+@pytest.mark.django_db
+def test_fetch_range_requests_only_business_days(client, monkeypatch):
+    """Test: fetch-range nie pyta NBP o weekendy."""
+    requested = []
+
+    def fake_fetch(date_str):
+        requested.append(date_str)
+        return _nbp_table(date_str)
+
+    monkeypatch.setattr("rates.views.fetch_table", fake_fetch)
+    resp = client.post("/api/currencies/fetch-range/?date_from=2026-01-29&date_to=2026-02-02")
+    assert resp.status_code == 200
+    assert requested == ["2026-01-29", "2026-01-30", "2026-02-02"]
+    assert resp.json()["fetched_dates_count"] == 3
+
+
+@pytest.mark.django_db
+def test_rates_coverage_reports_missing_days(client, db):
+    """Test: coverage zwraca dni robocze bez kursów."""
+    for d in (DATE_MID, DATE_LATEST):
+        ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=d)
+    resp = client.get(f"/api/rates/coverage/?date_from={DATE_OTHER.isoformat()}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["date_to"] == DATE_LATEST.isoformat()
+    assert body["expected_days"] == 2
+    assert body["missing"] == [DATE_OTHER.isoformat()]
+
+    resp = client.get("/api/rates/coverage/")
+    assert resp.json()["missing_count"] == 10
+
+
+@pytest.mark.django_db
+def test_far_future_dates_are_clamped(client, monkeypatch):
+    """Test: daty z roku 9999 nie kończą się OverflowError - zakres obcinamy do dzisiaj."""
+    monkeypatch.setattr("rates.views.fetch_table", lambda d: pytest.fail("NBP should not be asked"))
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+
+    resp = client.get("/api/rates/coverage/?date_to=9999-12-31")
+    assert resp.status_code == 200
+    assert resp.json()["date_to"] == date.today().isoformat()
+
+    resp = client.post("/api/currencies/fetch-range/?date_from=9999-12-20&date_to=9999-12-31")
+    assert resp.status_code == 200
+    assert resp.json()["fetched_dates_count"] == 0
+    assert business_days(date(9999, 12, 30), date(9999, 12, 31)) == [date(9999, 12, 30), date(9999, 12, 31)]
+
+
+@pytest.mark.django_db
+def test_rates_coverage_empty(client, db):
+    resp = client.get("/api/rates/coverage/")
+    assert resp.status_code == 404
+
+
+@pytest.mark.django_db
+def test_rates_asof_uses_previous_table(client, db):
+    """Test: dla weekendu i wielu dat naraz zwracana jest ostatnia wcześniejsza tabela."""
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_OTHER, effective_date=DATE_OTHER)
+    ExchangeRate.objects.create(code=CODE_EUR, currency="Euro", rate=RATE_EUR_OTHER, effective_date=DATE_OTHER)
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+
+    resp = client.get(f"/api/rates/asof/?date=2026-02-01,{DATE_OTHER.isoformat()}&date=2026-01-01&codes=usd")
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["date"] for r in results] == [DATE_LATEST.isoformat(), DATE_OTHER.isoformat(), None]
+    assert [r["code"] for r in results[1]["rates"]] == [CODE_USD]
+    assert Decimal(results[0]["rates"][0]["rate"]) == RATE_USD_LATEST
+    assert results[2]["rates"] == []
+
+
+@pytest.mark.django_db
+def test_rates_asof_validation(client, db):
+    assert client.get("/api/rates/asof/").status_code == 400
+    assert client.get(f"/api/rates/asof/?date={DATE_BAD_FORMAT}").status_code == 400
+
+
+@pytest.mark.django_db
+def test_convert_batch_json(client, db):
+    """Test: przeliczenie partii kwot po kursie z dnia lub poprzedniej tabeli."""
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_OTHER, effective_date=DATE_OTHER)
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    rows = [
+        {"amount": "100.005", "code": "usd", "date": "2026-01-31"},
+        {"amount": 10, "code": CODE_USD, "date": DATE_LATEST.isoformat()},
+        {"amount": 1, "code": CODE_EUR, "date": DATE_LATEST.isoformat()},
+        {"amount": "x", "code": CODE_USD, "date": DATE_LATEST.isoformat()},
+    ]
+    resp = client.post("/api/convert/batch/", rows, format="json")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 4
+    assert body["errors"] == 2
+    first, second = body["results"][:2]
+    assert first["rate_date"] == DATE_LATEST.isoformat()
+    assert first["amount_pln"] == "354.02"
+    assert Decimal(second["amount_pln"]) == Decimal("35.40")
+    assert "error" in body["results"][2]
+
+    resp = client.post("/api/convert/batch/?mode=previous", rows[1:2], format="json")
+    assert resp.json()["results"][0]["rate_date"] == DATE_OTHER.isoformat()
+
+
+@pytest.mark.django_db
+def test_convert_batch_csv_and_ndjson(client, db):
+    ExchangeRate.objects.create(code=CODE_EUR, currency="Euro", rate=RATE_EUR_OTHER, effective_date=DATE_OTHER)
+    csv_body = f"amount,code,date\n2,EUR,{DATE_LATEST.isoformat()}\n"
+    resp = client.generic("POST", "/api/convert/batch/", csv_body, content_type="text/csv")
+    assert resp.json()["results"][0]["amount_pln"] == "8.42"
+
+    ndjson_body = f'{{"amount": 2, "code": "PLN", "date": "{DATE_LATEST.isoformat()}"}}\n'
+    resp = client.generic("POST", "/api/convert/batch/", ndjson_body, content_type="application/x-ndjson")
+    assert resp.json()["results"][0]["amount_pln"] == "2.00"
+
+
+@pytest.mark.django_db
+def test_convert_batch_validation(client, db):
+    assert client.get("/api/convert/batch/").status_code == 405
+    assert client.post("/api/convert/batch/?mode=spot", [], format="json").status_code == 400
+    resp = client.generic("POST", "/api/convert/batch/", "{", content_type="application/json")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_convert_batch_huge_amount_fails_only_its_row(client, db):
+    """Test: kwota poza precyzją Decimal daje błąd wiersza, a nie 500 dla całej partii."""
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    body = (
+        '[{"amount": 1e400, "code": "USD", "date": "2026-01-30"},'
+        ' {"amount": "1e30", "code": "PLN", "date": "2026-01-30"},'
+        ' {"amount": 1, "code": "USD", "date": "2026-01-30"}]'
+    )
+    resp = client.generic("POST", "/api/convert/batch/", body, content_type="application/json")
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert results[0]["error"] == results[1]["error"] == "amount is too large"
+    assert results[2]["amount_pln"] == "3.54"
+
+
+@pytest.mark.django_db
+def test_convert_batch_previous_mode_on_first_representable_date(client, db):
+    """Test: mode=previous dla 0001-01-01 daje błąd wiersza zamiast OverflowError."""
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    rows = [
+        {"amount": 1, "code": CODE_USD, "date": "0001-01-01"},
+        {"amount": 1, "code": CODE_USD, "date": "2026-02-02"},
+    ]
+    resp = client.post("/api/convert/batch/?mode=previous", rows, format="json")
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert results[0]["error"] == "no USD rate before 0001-01-01"
+    assert results[1]["amount_pln"] == "3.54"
+
+
+@pytest.mark.django_db
+def test_rates_series_single_code(client, db):
+    """Test: szereg jednej waluty zwraca tylko pary [data, kurs] w kolejności dat."""
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_OTHER, effective_date=DATE_MID)
+    ExchangeRate.objects.create(code=CODE_EUR, currency="Euro", rate=RATE_EUR_OTHER, effective_date=DATE_OTHER)
+
+    resp = client.get(f"/api/rates/series/usd/?date_from={DATE_MID.isoformat()}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["code"] == CODE_USD
+    assert [d for d, _ in body["data"]] == [DATE_MID.isoformat(), DATE_LATEST.isoformat()]
+    assert Decimal(body["data"][0][1]) == RATE_USD_OTHER
+
+    assert client.get("/api/rates/series/CHF/").status_code == 404
+    assert client.get(f"/api/rates/series/USD/?date_from={DATE_BAD_FORMAT}").status_code == 400
+
+
+@pytest.mark.django_db
+def test_rates_series_multi_code(client, db):
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    ExchangeRate.objects.create(code=CODE_EUR, currency="Euro", rate=RATE_EUR_OTHER, effective_date=DATE_OTHER)
+
+    resp = client.get(f"/api/rates/series/?codes=EUR,USD,CHF&date_to={DATE_OTHER.isoformat()}")
+    assert resp.status_code == 200
+    series = resp.json()["series"]
+    assert series[CODE_USD] == []
+    assert series["CHF"] == []
+    assert len(series[CODE_EUR]) == 1
+    assert client.get("/api/rates/series/").status_code == 400
+
+
+def _correlation_rates():
+    # USD i EUR poruszają się razem, CHF odwrotnie; 2026-01-05 nie ma kursu CHF
+    days = [date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 7), date(2026, 1, 8), date(2026, 1, 9)]
+    usd = ["4.0", "4.1", "4.05", "4.2", "4.3"]
+    eur = ["4.3", "4.4", "4.35", "4.5", "4.6"]
+    chf = ["4.6", None, "4.7", "4.5", "4.4"]
+    for day, *rates in zip(days, usd, eur, chf):
+        for code, rate in zip(("USD", "EUR", "CHF"), rates):
+            if rate:
+                ExchangeRate.objects.create(code=code, currency=code, rate=Decimal(rate), effective_date=day)
+
+
+@pytest.mark.django_db
+def test_rates_correlation_matrix(client, db):
+    """Test: korelacja liczona na wspólnych dniach, macierz symetryczna z jedynkami na przekątnej."""
+    _correlation_rates()
+
+    resp = client.get("/api/rates/correlation/?codes=usd,eur,chf")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["codes"] == ["CHF", "EUR", "USD"]
+    assert body["observations"] == 3
+    assert body["date_from"] == "2026-01-02"
+    corr = body["correlation"]
+    assert [corr[i][i] for i in range(3)] == [1.0, 1.0, 1.0]
+    assert corr[1][2] == corr[2][1] > 0.9
+    assert corr[0][2] < 0
+    assert body["covariance"][2][2] > 0
+
+    spearman = client.get("/api/rates/correlation/?codes=USD,EUR&method=spearman").json()
+    assert spearman["observations"] == 4
+    assert spearman["correlation"][0][1] == 1.0
+
+
+@pytest.mark.django_db
+def test_rates_correlation_validation(client, db):
+    _correlation_rates()
+    assert client.get("/api/rates/correlation/?codes=USD").status_code == 400
+    assert client.get("/api/rates/correlation/?method=kendall").status_code == 400
+    assert client.get(f"/api/rates/correlation/?date_from={DATE_BAD_FORMAT}").status_code == 400
+    assert client.get("/api/rates/correlation/?codes=USD,GBP").status_code == 404
+    assert client.get("/api/rates/correlation/?codes=USD,EUR&date_to=2026-01-05").status_code == 404
+
+
+@pytest.mark.django_db
+def test_fast_serialization_matches_serializer_format(client, db):
+    """Test: szybka ścieżka zwraca te same pola i format co ExchangeRateSerializer."""
+    from rates.serializers import ExchangeRateSerializer
+
+    obj = ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    resp = client.get("/api/rates/latest/")
+    assert resp["Content-Type"] == "application/json"
+    obj.refresh_from_db()
+    assert resp.json()["rates"] == [dict(ExchangeRateSerializer(obj).data)]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="partycjonowanie tylko w PostgreSQL")
+def test_partition_rates_keeps_data_and_queries(client, db):
+    """Test: po przejściu na partycje roczne dane i zapytania po zakresie działają jak wcześniej."""
+    from rates import partitions
+
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_OTHER, effective_date=date(2024, 5, 6))
+    call_command("partition_rates", "--convert", "--years-ahead", "2")
+
+    assert partitions.is_partitioned()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM rates_exchangerate_y2024")
+        assert cursor.fetchone()[0] == 1
+    ExchangeRate.objects.create(code=CODE_EUR, currency="Euro", rate=RATE_EUR_OTHER, effective_date=DATE_OTHER)
+    resp = client.get(f"/api/rates/range/?date_from={DATE_OTHER.isoformat()}&date_to={DATE_LATEST.isoformat()}")
+    assert len(resp.json()["dates"]) == 2
+
+    # backfill starszego roku trafia do DEFAULT, a kolejne uruchomienie tworzy dla niego partycję
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_OTHER, effective_date=date(2010, 3, 1))
+    assert partitions.default_years() == [2010]
+    call_command("partition_rates")
+    assert partitions.default_years() == []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM rates_exchangerate_y2010")
+        assert cursor.fetchone()[0] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="sprawdza komunikat dla innych baz")
+def test_partition_rates_requires_postgresql():
+    with pytest.raises(CommandError):
+        call_command("partition_rates")
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_views_and_queries(client, db):
+    """Test: /api/metrics/ pokazuje czas, liczbę zapytań i rozmiar odpowiedzi per widok."""
+    from rates import metrics
+
+    metrics.reset()
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    client.get("/api/rates/latest/")
+
+    resp = client.get("/api/metrics/")
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain")
+    body = resp.content.decode()
+    assert "# TYPE fx_http_request_duration_seconds histogram" in body
+    assert 'fx_http_request_duration_seconds_count{method="GET",status="200",view="latest_rates"} 1' in body
+    assert 'fx_db_queries_per_request_sum{view="latest_rates"}' in body
+    assert 'fx_http_response_size_bytes_bucket{view="latest_rates",le="+Inf"} 1' in body
+
+
+@pytest.mark.django_db
+def test_metrics_count_queries_under_asgi(db):
+    """Test: pod ASGI (AsyncClient) synchroniczny widok dalej raportuje zapytania SQL."""
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+    from rates import metrics
+
+    metrics.reset()
+    async_to_sync(AsyncClient().get)("/api/currencies/")
+    assert 'fx_db_queries_per_request_sum{view="list_currencies"} 1' in metrics.render()
+
+
+@pytest.mark.django_db
+def test_slow_request_log_lists_queries(client, db, settings, caplog):
+    settings.RATES_SLOW_REQUEST_MS = 0.0001
+    with caplog.at_level("WARNING", logger="rates.slow"):
+        client.get("/api/currencies/")
+    assert "Slow request GET /api/currencies/" in caplog.text
+    assert "SELECT" in caplog.text
+
+
+def test_api_settings_profile_skips_admin_and_heavy_imports():
+    """Test: profil config.settings_api ładuje URLconf bez admina, DRF, requests i NumPy."""
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "import json, sys, django; django.setup()\n"
+        "from django.urls import get_resolver, resolve, Resolver404\n"
+        "get_resolver().url_patterns\n"
+        "resolve('/api/health/')\n"
+        "try:\n    resolve('/admin/'); admin = True\nexcept Resolver404:\n    admin = False\n"
+        "heavy = [m for m in ('django.contrib.admin', 'rest_framework', 'requests', 'numpy') if m in sys.modules]\n"
+        "print(json.dumps({'admin': admin, 'heavy': heavy}))\n"
+    )
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="config.settings_api")
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert json.loads(proc.stdout) == {"admin": False, "heavy": []}
+
+
+def _read_stream(url, headers=None, chunks=2):
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    async def read():
+        resp = await AsyncClient().get(url, headers=headers or {})
+        content = resp.streaming_content
+        received = [await anext(content) for _ in range(chunks)]
+        await content.aclose()
+        return resp, received
+
+    return async_to_sync(read)()
+
+
+@pytest.mark.django_db
+def test_rates_stream_sends_table_newer_than_last_event_id(db):
+    """Test: SSE po wznowieniu od starszej daty od razu wysyła nową tabelę."""
+    from rates.stream import watcher
+
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    ExchangeRate.objects.create(code=CODE_EUR, currency="Euro", rate=RATE_EUR_OTHER, effective_date=DATE_LATEST)
+    watcher.wake()
+
+    resp, (retry, event) = _read_stream("/api/rates/stream/", {"Last-Event-ID": DATE_OTHER.isoformat()})
+    assert resp["Content-Type"] == "text/event-stream"
+    assert retry.startswith(b"retry:")
+    lines = event.decode().splitlines()
+    assert lines[:2] == [f"id: {DATE_LATEST.isoformat()}", "event: rates"]
+    payload = json.loads(lines[2].removeprefix("data: "))
+    assert payload == {"date": DATE_LATEST.isoformat(), "rates": [[CODE_EUR, "4.210000"], [CODE_USD, "3.540000"]]}
+
+
+@pytest.mark.django_db
+def test_rates_stream_under_wsgi_sends_chunks_immediately(db, settings):
+    """Test: pod WSGI (synchroniczny Client) strumień wysyła pierwsze zdarzenia od razu."""
+    from django.test import Client
+    from rates.stream import watcher
+
+    settings.RATES_STREAM_POLL_SECONDS = 0
+    ExchangeRate.objects.create(code=CODE_USD, currency="US Dollar", rate=RATE_USD_LATEST, effective_date=DATE_LATEST)
+    watcher.wake()
+
+    resp = Client().get("/api/rates/stream/", headers={"Last-Event-ID": DATE_OTHER.isoformat()})
+    content = iter(resp.streaming_content)
+    assert next(content).startswith(b"retry:")
+    assert next(content).startswith(f"id: {DATE_LATEST.isoformat()}".encode())
+    resp.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rates_stream_closes_connection_after_poll(monkeypatch):
+    """Test: strumień nie trzyma połączenia z bazą między cyklami."""
+    from rates import stream
+
+    closed = []
+    monkeypatch.setattr(connection, "close", lambda: closed.append(True))
+    stream.watcher.wake()
+    assert stream._poll(DATE_LATEST) == (None, DATE_LATEST)
+    assert closed == [True]
+
+
+@pytest.mark.django_db
+def test_rates_stream_bad_last_event_id(client, db):
+    resp = client.get("/api/rates/stream/?since=yesterday")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_latest_rates_from_snapshot_with_daily_change(client, db, monkeypatch, django_assert_num_queries):
+    """Test: po zapisie tabeli najnowsze kursy są jednym odczytem migawki, ze zmianą d/d."""
+    from rates.models import LatestRate
+
+    ExchangeRate.objects.create(code=CODE_USD, currency="dolar amerykański", rate=RATE_USD_OTHER, effective_date=DATE_OTHER)
+    monkeypatch.setattr("rates.views.fetch_table", lambda d: _nbp_table(DATE_LATEST.isoformat()))
+    client.post("/api/currencies/fetch/")
+    assert LatestRate.objects.get(code=CODE_USD).previous_date == DATE_OTHER
+
+    cache.clear()
+    with django_assert_num_queries(1):
+        resp = client.get("/api/rates/latest/")
+    body = resp.json()
+    assert body["date"] == DATE_LATEST.isoformat()
+    usd = body["rates"][0]
+    assert usd["rate"] == "3.540000"
+    assert usd["previous_rate"] == "3.600000"
+    assert usd["change"] == "-0.060000"
+    assert usd["change_pct"] == "-1.6667"
+
+    with django_assert_num_queries(0):
+        client.get("/api/rates/latest/")
+
+
+@pytest.mark.django_db
+def test_backfill_does_not_replace_latest_snapshot(client, db, monkeypatch):
+    from rates.models import LatestRate
+
+    monkeypatch.setattr("rates.views.fetch_table", lambda d: _nbp_table(d or DATE_LATEST.isoformat()))
+    client.post("/api/currencies/fetch/")
+    client.post(f"/api/currencies/fetch/?date={DATE_MID.isoformat()}")
+    latest = LatestRate.objects.get(code=CODE_USD)
+    assert latest.effective_date == DATE_LATEST
+    assert latest.previous_date == DATE_MID
+
+    # backfill dnia bezpośrednio przed najnowszym zmienia bazę zmiany d/d
+    client.post(f"/api/currencies/fetch/?date={DATE_OTHER.isoformat()}")
+    assert LatestRate.objects.get(code=CODE_USD).previous_date == DATE_OTHER
+
+    # starszy backfill już nie
+    client.post("/api/currencies/fetch/?date=2026-01-20")
+    assert LatestRate.objects.get(code=CODE_USD).previous_date == DATE_OTHER
@@ -3,12 +3,19 @@ from . import views
 
 urlpatterns = [
     path("health/", views.health, name="health"),
+    path("metrics/", views.metrics_view, name="metrics"),                       # GET metryki w formacie Prometheusa
 
     # Rates
     path("rates/", views.list_rates, name="list_rates"),                        # GET ?date=
     path("rates/latest/", views.latest_rates, name="latest_rates"),
     path("rates/range/", views.rates_range, name="rates_range"),                # GET ?date_from=&date_to
     path("rates/summary/", views.rates_summary, name="rates_summary"),          # GET ?period=year|quarter|month|day
+    path("rates/series/", views.rates_series, name="rates_series_multi"),       # GET ?codes=USD,EUR&date_from=&date_to=
+    path("rates/series/<str:code>/", views.rates_series, name="rates_series"),  # GET ?date_from=&date_to= -> [[data, kurs], ...]
+    path("rates/stream/", views.rates_stream, name="rates_stream"),             # GET SSE: nowe tabele (Last-Event-ID = data)
+    path("rates/asof/", views.rates_asof, name="rates_asof"),                   # GET ?date=&codes= (ostatnia tabela <= date)
+    path("rates/correlation/", views.rates_correlation, name="rates_correlation"),  # GET ?codes=&date_from=&date_to=&method=pearson|spearman
+    path("rates/coverage/", views.rates_coverage, name="rates_coverage"),       # GET ?date_from=&date_to (brakujące dni robocze)
 
     # Currencies (aliasy do powyższych)
     path("currencies/", views.list_currencies, name="list_currencies"),         # GET lista kodów
@@ -16,4 +23,7 @@ urlpatterns = [
     path("currencies/fetch/", views.fetch_currencies, name="fetch_currencies"), # POST pobierz z NBP (csrf_exempt)
     path("currencies/fetch-range/", views.fetch_currencies_range, name="fetch_currencies_range"),  # POST ?date_from=&date_to=
     path("currencies/<date_str>/", views.rates_by_date, name="rates_by_date"),  # GET konkretna data
+
+    # Przeliczenia
+    path("convert/batch/", views.convert_batch, name="convert_batch"),          # POST lista {amount, code, date} -> PLN
 ]
\ No newline at end of file
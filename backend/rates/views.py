@@ -1,19 +1,32 @@
-from datetime import datetime, date as date_type, timedelta
-from decimal import Decimal
+from datetime import datetime, date as date_type
 
-from django.db.models import Max
-from django.db.models.functions import TruncYear, TruncQuarter, TruncMonth, TruncDate
-from django.http import JsonResponse, HttpResponseNotAllowed
+from django.db.models import Max, Min
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt 
+from . import metrics
+from .asof import lookup_asof
+from .business_days import business_days
+from .correlation import METHODS as CORRELATION_METHODS, CorrelationError, cached_correlation
+from .convert import MAX_BATCH_BYTES, MAX_BATCH_ROWS, MODES, BatchError, convert_rows, parse_rows
+from .fastjson import FastJsonResponse, rate_rows, rate_str
 from .models import ExchangeRate
-from .serializers import ExchangeRateSerializer
-import requests
+from .nbp import FIRST_TABLE_DATE, NBPError, fetch_table, store_table
+from .snapshot import latest_payload
+from .stream import event_stream, event_stream_sync, watcher
+from .summary import PERIODS, cached_summary
 
 
 def health(request):
     return JsonResponse({"status": "ok"})
 
 
+def metrics_view(request):
+    """GET /api/metrics/ - metryki procesu w formacie Prometheusa."""
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def _get_rates_for_date(date_param: str | None):
     if date_param:
         try:
@@ -21,16 +34,24 @@ def _get_rates_for_date(date_param: str | None):
         except ValueError:
             return None, JsonResponse({"error": "invalid date format, expected YYYY-MM-DD"}, status=400)
     else:
+        # najnowsze kursy z migawki LatestRate (jedno zapytanie albo cache); pusta migawka -> pełne zapytanie
+        snapshot = latest_payload()
+        if snapshot:
+            return (snapshot["date"], snapshot["rates"]), None
         target_date = ExchangeRate.objects.aggregate(Max("effective_date"))["effective_date__max"]
 
     if not target_date:
         return None, JsonResponse({"error": "no rates available"}, status=404)
 
-    qs = ExchangeRate.objects.filter(effective_date=target_date).order_by("code")
-    if not qs.exists():
+    rows = (
+        ExchangeRate.objects.filter(effective_date=target_date)
+        .order_by("code")
+        .values_list("code", "currency", "rate", "effective_date")
+    )
+    data = rate_rows(rows)
+    if not data:
         return None, JsonResponse({"error": "no rates available"}, status=404)
 
-    data = ExchangeRateSerializer(qs, many=True).data
     return (target_date, data), None
 
 
@@ -39,7 +60,7 @@ def list_rates(request):
     if error:
         return error
     target_date, data = result
-    return JsonResponse({"base": "PLN", "date": target_date.isoformat(), "rates": data})
+    return FastJsonResponse({"base": "PLN", "date": target_date, "rates": data})
 
 
 def latest_rates(request):
@@ -58,7 +79,7 @@ def list_currencies(request):
         .distinct()
         .order_by("code")
     )
-    return JsonResponse({"currencies": list(qs)})
+    return FastJsonResponse({"currencies": list(qs)})
 
 
 def rates_range(request):
@@ -87,92 +108,248 @@ def rates_range(request):
     if date_from > date_to:
         return JsonResponse({"error": "date_from must be <= date_to"}, status=400)
 
-    qs = (
+    rows = (
         ExchangeRate.objects
         .filter(effective_date__gte=date_from, effective_date__lte=date_to)
         .order_by("effective_date", "code")
+        .values_list("effective_date", "code", "currency", "rate")
     )
 
-    if not qs.exists():
-        return JsonResponse({"error": "no rates available for this date range"}, status=404)
-
     # Grupowanie po dacie
     result = {}
-    for rate in qs:
-        key = rate.effective_date.isoformat()
-        if key not in result:
-            result[key] = []
-        result[key].append({
-            "code": rate.code,
-            "currency": rate.currency,
-            "rate": str(rate.rate),
-        })
+    for effective_date, code, currency, rate in rows:
+        result.setdefault(effective_date.isoformat(), []).append(
+            {"code": code, "currency": currency, "rate": rate_str(rate)}
+        )
 
-    return JsonResponse({
+    if not result:
+        return JsonResponse({"error": "no rates available for this date range"}, status=404)
+
+    return FastJsonResponse({
         "base": "PLN",
-        "date_from": date_from.isoformat(),
-        "date_to": date_to.isoformat(),
+        "date_from": date_from,
+        "date_to": date_to,
         "dates": result,
     })
 
 
-@csrf_exempt
-def fetch_currencies(request):
+async def rates_stream(request):
+    """GET /api/rates/stream/ (text/event-stream)
+    Wysyła zdarzenie `rates` z nową datą i kursami, gdy w bazie pojawi się nowa tabela.
+    Po wznowieniu połączenia (nagłówek Last-Event-ID albo ?since=YYYY-MM-DD)
+    od razu dosyła tabelę nowszą niż podana data.
+    """
+    since = request.headers.get("Last-Event-ID") or request.GET.get("since")
+    if since:
+        try:
+            last_seen = datetime.strptime(since, "%Y-%m-%d").date()
+        except ValueError:
+            return JsonResponse({"error": "invalid Last-Event-ID/since, expected YYYY-MM-DD"}, status=400)
+    else:
+        last_seen = await sync_to_async(watcher.latest)()
+
+    # pod WSGI Django nie streamuje asynchronicznego generatora, tylko czyta go w całości
+    stream = event_stream(last_seen) if isinstance(request, ASGIRequest) else event_stream_sync(last_seen)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 
+def rates_asof(request):
+    """GET /api/rates/asof/?date=YYYY-MM-DD[,YYYY-MM-DD...]&codes=USD,EUR
+    Dla każdej daty zwraca ostatnią tabelę opublikowaną w tym dniu lub wcześniej
+    (np. weekend/święto -> poprzedni dzień roboczy). Parametr date może się powtarzać.
+    """
+    date_strs = [d for value in request.GET.getlist("date") for d in value.split(",") if d]
+    if not date_strs:
+        return JsonResponse({"error": "date parameter is required (YYYY-MM-DD)"}, status=400)
+
+    try:
+        dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in date_strs]
+    except ValueError:
+        return JsonResponse({"error": "invalid date format, expected YYYY-MM-DD"}, status=400)
+
+    codes = [c.upper() for c in request.GET.get("codes", "").split(",") if c]
+    resolved, tables = lookup_asof(dates, codes)
+
+    results = []
+    for d in dates:
+        effective_date = resolved[d]
+        results.append({
+            "requested_date": d,
+            "date": effective_date,
+            "rates": [
+                {"code": code, "currency": currency, "rate": rate_str(rate)}
+                for code, currency, rate in tables.get(effective_date, [])
+            ],
+        })
+
+    return FastJsonResponse({"base": "PLN", "results": results})
+
+
+@csrf_exempt
+def convert_batch(request):
+    """POST /api/convert/batch/?mode=asof|previous
+    Przelicza listę {amount, code, date} na PLN (JSON, NDJSON albo CSV w body).
+    """
     if request.method != "POST":
         return HttpResponseNotAllowed(["POST"])
 
-    date_param = request.GET.get("date")
+    mode = request.GET.get("mode", "asof")
+    if mode not in MODES:
+        return JsonResponse({"error": "invalid mode, expected one of: asof, previous"}, status=400)
 
-    if date_param:
-        url = f"https://api.nbp.pl/api/exchangerates/tables/A/{date_param}/?format=json"
-    else:
-        url = "https://api.nbp.pl/api/exchangerates/tables/A/?format=json"
+    # body czytamy strumieniowo z własnym limitem (DATA_UPLOAD_MAX_MEMORY_SIZE jest za mały na 100k wierszy)
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > MAX_BATCH_BYTES:
+        return JsonResponse({"error": f"request body too large, limit is {MAX_BATCH_BYTES} bytes"}, status=413)
 
     try:
-        resp = requests.get(url, timeout=10)
-    except requests.Timeout as exc:
-        return JsonResponse({"error": f"NBP request timed out: {exc}"}, status=502)
-    except requests.RequestException as exc:
-        return JsonResponse({"error": f"NBP request failed: {exc}"}, status=502)
-
-    if resp.status_code == 404:
-        return JsonResponse({"error": f"NBP returned 404 for date={date_param or 'latest'}"}, status=404)
-    if resp.status_code >= 500:
-        return JsonResponse({"error": f"NBP returned {resp.status_code} (server error)"}, status=502)
-    if resp.status_code != 200:
-        return JsonResponse({"error": f"NBP returned status {resp.status_code}: {resp.text}"}, status=resp.status_code)
+        rows = parse_rows(request, request.content_type)
+    except (BatchError, UnicodeDecodeError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if len(rows) > MAX_BATCH_ROWS:
+        return JsonResponse({"error": f"too many rows, limit is {MAX_BATCH_ROWS}"}, status=413)
 
+    results = convert_rows(rows, mode)
+    errors = sum(1 for r in results if "error" in r)
+    return FastJsonResponse({"base": "PLN", "mode": mode, "count": len(results), "errors": errors, "results": results})
+
+
+def rates_coverage(request):
+    """GET /api/rates/coverage/?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    Zwraca dni robocze bez kursów w bazie. Bez parametrów sprawdza cały zapisany zakres.
+    """
+    bounds = ExchangeRate.objects.aggregate(first=Min("effective_date"), last=Max("effective_date"))
+    if not bounds["first"]:
+        return JsonResponse({"error": "no rates available"}, status=404)
+
+    date_from, date_to = bounds["first"], bounds["last"]
     try:
-        data = resp.json()
-    except ValueError as exc:
-        return JsonResponse({"error": f"Cannot parse JSON from NBP: {exc}"}, status=502)
-
-    if not data or not isinstance(data, list):
-        return JsonResponse({"error": "Unexpected response format from NBP"}, status=502)
-
-    table = data[0]
-    effective_date = table.get("effectiveDate")
-    rates = table.get("rates", [])
-    if not effective_date or not rates:
-        return JsonResponse({"error": "No rates in NBP response"}, status=502)
-
-    created, updated = 0, 0
-    for r in rates:
-        code = r.get("code")
-        currency = r.get("currency")
-        mid = r.get("mid")
-        if not (code and currency and mid):
-            continue
-        _, is_created = ExchangeRate.objects.update_or_create(
-            code=code,
-            effective_date=effective_date,
-            defaults={"currency": currency, "rate": Decimal(str(mid))},
-        )
-        if is_created:
-            created += 1
-        else:
-            updated += 1
+        if request.GET.get("date_from"):
+            date_from = datetime.strptime(request.GET["date_from"], "%Y-%m-%d").date()
+        if request.GET.get("date_to"):
+            date_to = datetime.strptime(request.GET["date_to"], "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"error": "invalid date format, expected YYYY-MM-DD"}, status=400)
+
+    if date_from > date_to:
+        return JsonResponse({"error": "date_from must be <= date_to"}, status=400)
+
+    # poza zakresem tabel NBP nie ma czego brakować (i nie liczymy kalendarza na tysiące lat)
+    date_from = max(date_from, FIRST_TABLE_DATE)
+    date_to = min(date_to, max(date_type.today(), bounds["last"]))
+
+    stored = set(
+        ExchangeRate.objects
+        .filter(effective_date__gte=date_from, effective_date__lte=date_to)
+        .values_list("effective_date", flat=True)
+        .distinct()
+    )
+    expected = business_days(date_from, date_to)
+    missing = [d for d in expected if d not in stored]
+
+    return FastJsonResponse({
+        "date_from": date_from,
+        "date_to": date_to,
+        "expected_days": len(expected),
+        "stored_days": len(stored),
+        "missing_count": len(missing),
+        "missing": missing,
+    })
+
+
+def _optional_range(request):
+    """Opcjonalne date_from/date_to z query stringa. Zwraca (date_from, date_to, error)."""
+    bounds = {}
+    for name in ("date_from", "date_to"):
+        value = request.GET.get(name)
+        try:
+            bounds[name] = datetime.strptime(value, "%Y-%m-%d").date() if value else None
+        except ValueError:
+            return None, None, JsonResponse({"error": f"invalid {name} format, expected YYYY-MM-DD"}, status=400)
+    date_from, date_to = bounds["date_from"], bounds["date_to"]
+    if date_from and date_to and date_from > date_to:
+        return None, None, JsonResponse({"error": "date_from must be <= date_to"}, status=400)
+    return date_from, date_to, None
+
+
+def _series(codes, date_from, date_to):
+    # filtr po code + effective_date trafia w indeks unikalny (code, effective_date)
+    qs = ExchangeRate.objects.filter(code__in=codes)
+    if date_from:
+        qs = qs.filter(effective_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(effective_date__lte=date_to)
+
+    series = {code: [] for code in codes}
+    for code, effective_date, rate in qs.order_by("code", "effective_date").values_list("code", "effective_date", "rate"):
+        series[code].append([effective_date, rate_str(rate)])
+    return series
+
+
+def rates_series(request, code=None):
+    """GET /api/rates/series/<code>/?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    GET /api/rates/series/?codes=USD,EUR&date_from=...&date_to=...
+    Szereg czasowy [data, kurs] dla wybranych walut (bez grupowania po dacie).
+    """
+    date_from, date_to, error = _optional_range(request)
+    if error:
+        return error
+
+    if code:
+        data = _series([code.upper()], date_from, date_to)[code.upper()]
+        if not data:
+            return JsonResponse({"error": "no rates available for this currency"}, status=404)
+        return FastJsonResponse({"base": "PLN", "code": code.upper(), "data": data})
+
+    codes = list(dict.fromkeys(c.upper() for c in request.GET.get("codes", "").split(",") if c))
+    if not codes:
+        return JsonResponse({"error": "codes parameter is required (e.g. USD,EUR)"}, status=400)
+    return FastJsonResponse({"base": "PLN", "series": _series(codes, date_from, date_to)})
+
+
+def rates_correlation(request):
+    """GET /api/rates/correlation/?codes=USD,EUR,CHF&date_from=...&date_to=...&method=pearson|spearman
+    Macierz korelacji i kowariancji dziennych log-stóp zwrotu, liczona na dniach
+    z kursami wszystkich walut. Bez codes - wszystkie waluty z zakresu.
+    """
+    date_from, date_to, error = _optional_range(request)
+    if error:
+        return error
+
+    method = request.GET.get("method", "pearson")
+    if method not in CORRELATION_METHODS:
+        return JsonResponse({"error": "invalid method, expected one of: pearson, spearman"}, status=400)
+
+    codes = list(dict.fromkeys(c.upper() for c in request.GET.get("codes", "").split(",") if c))
+    if len(codes) == 1:
+        return JsonResponse({"error": "codes must list at least two currencies (e.g. USD,EUR)"}, status=400)
+
+    try:
+        result = cached_correlation(codes, date_from, date_to, method)
+    except CorrelationError as exc:
+        return JsonResponse({"error": str(exc)}, status=404)
+    return FastJsonResponse({"base": "PLN", **result})
+
+
+@csrf_exempt
+def fetch_currencies(request):
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    try:
+        table = fetch_table(request.GET.get("date"))
+    except NBPError as exc:
+        return JsonResponse({"error": exc.message}, status=exc.status)
+
+    effective_date, created, updated = store_table(table)
 
     return JsonResponse(
         {"status": "ok", "date": effective_date, "created": created, "updated": updated},
@@ -210,58 +387,28 @@ def fetch_currencies_range(request):
     if date_from > date_to:
         return JsonResponse({"error": "date_from must be <= date_to"}, status=400)
 
-    total_created, total_updated, fetched_dates, errors = 0, 0, [], []
-
-    current = date_from
-    while current <= date_to:
-        date_str = current.isoformat()
-        url = f"https://api.nbp.pl/api/exchangerates/tables/A/{date_str}/?format=json"
+    # NBP nie ma tabel sprzed 2002 ani z przyszłości
+    date_from = max(date_from, FIRST_TABLE_DATE)
+    date_to = min(date_to, date_type.today())
 
-        try:
-            resp = requests.get(url, timeout=10)
-        except requests.RequestException:
-            errors.append(date_str)
-            current += timedelta(days=1)
-            continue
+    total_created, total_updated, fetched_dates, errors = 0, 0, [], []
 
-        if resp.status_code != 200:
-            current += timedelta(days=1)
-            continue
+    # pytamy NBP tylko o dni publikacji (bez weekendów i świąt)
+    for day in business_days(date_from, date_to):
+        date_str = day.isoformat()
 
         try:
-            data = resp.json()
-        except ValueError:
-            errors.append(date_str)
-            current += timedelta(days=1)
+            table = fetch_table(date_str)
+        except NBPError as exc:
+            # brak odpowiedzi lub nieczytelny JSON to błąd, inne kody NBP (np. 404 w święta) pomijamy
+            if exc.nbp_status is None:
+                errors.append(date_str)
             continue
 
-        if not data or not isinstance(data, list):
-            current += timedelta(days=1)
-            continue
-
-        table = data[0]
-        effective_date = table.get("effectiveDate")
-        rates = table.get("rates", [])
-
-        if effective_date and rates:
-            for r in rates:
-                code = r.get("code")
-                currency = r.get("currency")
-                mid = r.get("mid")
-                if not (code and currency and mid):
-                    continue
-                _, is_created = ExchangeRate.objects.update_or_create(
-                    code=code,
-                    effective_date=effective_date,
-                    defaults={"currency": currency, "rate": Decimal(str(mid))},
-                )
-                if is_created:
-                    total_created += 1
-                else:
-                    total_updated += 1
-            fetched_dates.append(effective_date)
-
-        current += timedelta(days=1)
+        effective_date, created, updated = store_table(table)
+        total_created += created
+        total_updated += updated
+        fetched_dates.append(effective_date)
 
     return JsonResponse({
         "status": "ok",
@@ -276,47 +423,22 @@ def fetch_currencies_range(request):
 
 def rates_summary(request):
     period = request.GET.get("period")
-    if period not in {"year", "quarter", "month", "day"}:
+    if period not in PERIODS:
         return JsonResponse({"error": "invalid period, expected one of: year, quarter, month, day"}, status=400)
 
-    trunc_map = {
-        "year": TruncYear("effective_date"),
-        "quarter": TruncQuarter("effective_date"),
-        "month": TruncMonth("effective_date"),
-        "day": TruncDate("effective_date"),
-    }
-    trunc_expr = trunc_map[period]
-
-    qs = ExchangeRate.objects.all()
-
+    date_from, date_to = None, None
     date_from_str = request.GET.get("date_from")
     date_to_str = request.GET.get("date_to")
     if date_from_str:
         try:
             date_from = datetime.strptime(date_from_str, "%Y-%m-%d").date()
-            qs = qs.filter(effective_date__gte=date_from)
         except ValueError:
             pass
     if date_to_str:
         try:
             date_to = datetime.strptime(date_to_str, "%Y-%m-%d").date()
-            qs = qs.filter(effective_date__lte=date_to)
         except ValueError:
             pass
 
-    agg = (
-        qs
-        .annotate(period=trunc_expr)
-        .values("period", "code", "currency")
-        .order_by("period", "code")
-        .annotate(avg_rate=Max("rate"))
-    )
-
-    result = {}
-    for row in agg:
-        key = row["period"].isoformat()
-        result.setdefault(key, []).append(
-            {"code": row["code"], "currency": row["currency"], "rate": str(row["avg_rate"])}
-        )
-
-    return JsonResponse({"base": "PLN", "period": period, "data": result})
\ No newline at end of file
+    result = cached_summary(period, date_from, date_to)
+    return FastJsonResponse({"base": "PLN", "period": period, "data": result})
@@ -3,7 +3,7 @@
 import { TestBed, ComponentFixture } from '@angular/core/testing';
 import { AppComponent } from './app';
 import { RatesService } from './services/rates.service';
-import { of } from 'rxjs';
+import { NEVER, of } from 'rxjs';
 
 describe('AppComponent', () => {
   let fixture: ComponentFixture<AppComponent>;
@@ -12,8 +12,9 @@ describe('AppComponent', () => {
 
   beforeEach(async () => {
     ratesServiceSpy = jasmine.createSpyObj('RatesService', [
-      'fetch', 'fetchRange', 'getLatest', 'getByDate', 'getByDateRange', 'getSummary', 'getCurrencies'
+      'fetch', 'fetchRange', 'getLatest', 'getByDate', 'getByDateRange', 'getSummary', 'getSeries', 'getCurrencies', 'streamRates'
     ]);
+    ratesServiceSpy.streamRates.and.returnValue(NEVER);
     await TestBed.configureTestingModule({
       imports: [AppComponent],
       providers: [{ provide: RatesService, useValue: ratesServiceSpy }]
@@ -119,6 +120,33 @@ describe('AppComponent', () => {
     expect(app.loading).toBe(false);
   });
 
+  // ===== Test: Wykres dzienny wybranych walut z /rates/series/ =====
+  it('should load the daily chart of selected currencies from getSeries', () => {
+    ratesServiceSpy.getSeries.and.returnValue(of({
+      base: 'PLN',
+      series: { USD: [['2024-01-10', '3.540000'], ['2024-01-11', '3.550000']], EUR: [['2024-01-10', '4.210000']] },
+    }));
+    app.availableCurrencies = [{ code: 'EUR', currency: 'euro' }, { code: 'USD', currency: 'dolar amerykański' }];
+    app.showChart = true;
+    app.summaryPeriod = 'day';
+    app.selectedCurrencies = ['USD', 'EUR'];
+    app.dateFrom = '2024-01-10';
+    app.loadSummary();
+    expect(ratesServiceSpy.getSeries).toHaveBeenCalledWith(['USD', 'EUR'], '2024-01-10', '');
+    expect(ratesServiceSpy.getSummary).not.toHaveBeenCalled();
+    expect(app.summaryData.data['2024-01-10']).toEqual([
+      { code: 'USD', currency: 'dolar amerykański', rate: '3.540000' },
+      { code: 'EUR', currency: 'euro', rate: '4.210000' },
+    ]);
+
+    // powrót do tabeli ładuje pełne podsumowanie
+    const summary = { base: 'PLN', period: 'day', data: {} };
+    ratesServiceSpy.getSummary.and.returnValue(of(summary));
+    app.toggleChart();
+    expect(ratesServiceSpy.getSummary).toHaveBeenCalledWith('day', '2024-01-10', '');
+    expect(app.summaryData).toEqual(summary);
+  });
+
   // ===== Test: Filtrowanie po kodzie waluty =====
   it('should filter rates by selected currencies', () => {
     const rates = [
@@ -205,4 +233,24 @@ describe('AppComponent', () => {
     expect(rows.length).toBe(1);
     expect(rows[0].textContent).toContain('EUR');
   });
-});
\ No newline at end of file
+
+  // ===== Test: nowa tabela z SSE =====
+  it('should reload latest rates with daily change when a newer table is streamed', () => {
+    app.latestData = {
+      base: 'PLN', date: '2026-01-29',
+      rates: [{ code: 'USD', currency: 'dolar amerykański', rate: '3.600000', effective_date: '2026-01-29' }],
+    };
+    const latest = {
+      base: 'PLN', date: '2026-01-30',
+      rates: [{
+        code: 'USD', currency: 'dolar amerykański', rate: '3.540000', effective_date: '2026-01-30',
+        previous_rate: '3.600000', previous_date: '2026-01-29', change: '-0.060000', change_pct: '-1.6667',
+      }],
+    };
+    ratesServiceSpy.getLatest.and.returnValue(of(latest));
+    app.onNewRates({ date: '2026-01-30', rates: [['USD', '3.540000']] });
+    expect(ratesServiceSpy.getLatest).toHaveBeenCalled();
+    expect(app.latestData).toEqual(latest);
+    expect(app.latestData.rates[0].change_pct).toBe('-1.6667');
+  });
+});
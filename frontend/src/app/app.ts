@@ -1,6 +1,7 @@
-import { Component, ChangeDetectorRef, HostListener } from '@angular/core';
+import { Component, ChangeDetectorRef, HostListener, OnDestroy, OnInit } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { FormsModule } from '@angular/forms';
+import { Observable, Subscription, map } from 'rxjs';
 import { RatesService } from './services/rates.service';
 
 @Component({
@@ -10,7 +11,7 @@ import { RatesService } from './services/rates.service';
   templateUrl: './app.html',
   styleUrls: ['./app.scss'],
 })
-export class AppComponent {
+export class AppComponent implements OnInit, OnDestroy {
   title = 'Przeglądaj kursy walut';
 
   dateFrom = '';
@@ -30,8 +31,21 @@ export class AppComponent {
   rangeData: any = null;
   summaryData: any = null;
 
+  private streamSub?: Subscription;
+  private summaryFromSeries = false;
+
   constructor(private rates: RatesService, private cdr: ChangeDetectorRef) {}
 
+  ngOnInit() {
+    this.streamSub = this.rates.streamRates().subscribe({
+      next: (delta) => this.onNewRates(delta),
+    });
+  }
+
+  ngOnDestroy() {
+    this.streamSub?.unsubscribe();
+  }
+
   get rangeDateKeys(): string[] {
     if (!this.rangeData?.dates) return [];
     return Object.keys(this.rangeData.dates).sort();
@@ -100,6 +114,11 @@ export class AppComponent {
 
   toggleChart() {
     this.showChart = !this.showChart;
+    // tabela potrzebuje pełnego podsumowania, a nie tylko szeregów wybranych walut z wykresu
+    if (!this.showChart && this.summaryFromSeries) {
+      this.loadSummary();
+      return;
+    }
     if (this.showChart && this.summaryData) {
       setTimeout(() => this.renderChart(), 100);
     }
@@ -228,6 +247,21 @@ export class AppComponent {
     this.cdr.detectChanges();
   }
 
+  // Nowa tabela z NBP zapisana na serwerze: pobieramy najnowsze kursy ponownie
+  // (zdarzenie ma tylko [kod, kurs], a tabela pokazuje też zmianę d/d), odświeżamy podsumowanie
+  onNewRates(delta: { date: string; rates: [string, string][] }) {
+    if (this.latestData && !this.dateFrom && !this.dateTo && delta.date > this.latestData.date) {
+      this.rates.getLatest().subscribe({
+        next: (res) => {
+          this.latestData = res;
+          this.cdr.detectChanges();
+        },
+      });
+    } else {
+      this.refreshSummary();
+    }
+  }
+
   // Automatyczne odświeżanie podsumowania
   onPeriodChange() {
     this.refreshSummary();
@@ -337,12 +371,36 @@ export class AppComponent {
     }
   }
 
+  // Wykres dziennych kursów wybranych walut: same pary [data, kurs] z /rates/series/
+  // zamiast dziennego podsumowania wszystkich walut filtrowanego po stronie klienta
+  private get chartFromSeries(): boolean {
+    return this.showChart && this.summaryPeriod === 'day' && this.selectedCurrencies.length > 0;
+  }
+
+  private summaryRequest(): Observable<any> {
+    this.summaryFromSeries = this.chartFromSeries;
+    if (!this.chartFromSeries) {
+      return this.rates.getSummary(this.summaryPeriod, this.dateFrom, this.dateTo);
+    }
+    return this.rates.getSeries(this.selectedCurrencies, this.dateFrom, this.dateTo).pipe(
+      map((res) => {
+        const names: Record<string, string> = {};
+        for (const c of this.availableCurrencies) names[c.code] = c.currency;
+        const data: Record<string, { code: string; currency: string; rate: string }[]> = {};
+        for (const [code, points] of Object.entries(res.series as Record<string, [string, string][]>)) {
+          for (const [date, rate] of points) (data[date] ??= []).push({ code, currency: names[code] || code, rate });
+        }
+        return { base: res.base, period: 'day', data };
+      }),
+    );
+  }
+
   loadSummary() {
     this.message = '';
     this.latestData = null;
     this.rangeData = null;
     this.loading = true;
-    this.rates.getSummary(this.summaryPeriod, this.dateFrom, this.dateTo).subscribe({
+    this.summaryRequest().subscribe({
       next: (res) => {
         this.summaryData = res;
         this.doneSummary();
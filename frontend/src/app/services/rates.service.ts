@@ -22,6 +22,13 @@ export class RatesService {
     });
   }
 
+  getSeries(codes: string[], dateFrom?: string, dateTo?: string): Observable<any> {
+    const params: any = { codes: codes.join(',') };
+    if (dateFrom) params.date_from = dateFrom;
+    if (dateTo) params.date_to = dateTo;
+    return this.http.get(`${this.API_BASE}/rates/series/`, { params });
+  }
+
   getCurrencies(): Observable<any> {
     return this.http.get(`${this.API_BASE}/currencies/`);
   }
@@ -33,6 +40,17 @@ export class RatesService {
     return this.http.get(`${this.API_BASE}/rates/summary/`, { params });
   }
 
+  // Nowe tabele z serwera (SSE); EventSource sam wznawia połączenie z Last-Event-ID
+  streamRates(): Observable<{ date: string; rates: [string, string][] }> {
+    return new Observable((observer) => {
+      const source = new EventSource(`${this.API_BASE}/rates/stream/`);
+      source.addEventListener('rates', (event) => {
+        observer.next(JSON.parse((event as MessageEvent).data));
+      });
+      return () => source.close();
+    });
+  }
+
   fetch(date?: string): Observable<any> {
     const params: any = {};
     if (date) params.date = date;